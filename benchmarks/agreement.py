@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Cost-vs-Agreement Harness
+- Runs a pinned reference set of transcripts through several named evaluator
+  configurations (Config overrides: smaller models, packing, score-only, ...)
+- Records every LLM response and replays it on later runs, so re-running a
+  configuration costs nothing unless its prompts changed
+- Reports, per configuration, agreement with the baseline (per-metric MAE,
+  final-score MAE, Spearman rank correlation of final_weighted_score) next to
+  calls, tokens and wall time, and picks the cheapest one within tolerance
+
+Usage:
+    python benchmarks/agreement.py pin transcripts/ --out benchmarks/reference_set.json
+    python benchmarks/agreement.py run --configs benchmarks/agreement_configs.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# ---------- Reference set ----------
+def sha1_file(path: Path):
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def pin(transcripts_dir: Path, out: Path):
+    """Write a manifest of transcript names and content hashes."""
+    files = sorted(transcripts_dir.glob("*.txt"))
+    manifest = {
+        "transcripts_dir": os.path.relpath(transcripts_dir.resolve(), out.resolve().parent),
+        "transcripts": {f.name: sha1_file(f) for f in files}
+    }
+    out.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    print(f"Pinned {len(files)} transcript(s) in {out}")
+
+
+def materialize(manifest_path: Path, dest: Path):
+    """Copy the pinned transcripts into `dest`, refusing to run if any changed or went missing."""
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    source = (manifest_path.resolve().parent / manifest["transcripts_dir"]).resolve()
+    problems = []
+    for name, digest in manifest["transcripts"].items():
+        path = source / name
+        if not path.is_file():
+            problems.append(f"{name}: missing")
+        elif sha1_file(path) != digest:
+            problems.append(f"{name}: content changed since it was pinned")
+        else:
+            shutil.copy(path, dest / name)
+    if problems:
+        raise SystemExit("[ERROR] Reference set does not match its pin:\n  " + "\n  ".join(problems))
+    return sorted(manifest["transcripts"])
+
+
+# ---------- Record / replay ----------
+class Recorder:
+    """Wraps openai.ChatCompletion.create with a response store keyed by request content.
+
+    The n-th identical request within a run maps to the n-th recording, so repeated
+    samples of the same prompt replay distinct responses.
+    """
+
+    def __init__(self, path: Path, mode: str = "reuse"):
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.store = {}
+        if path.is_file() and mode != "refresh":
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self.store.setdefault(entry["key"], []).append(entry)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.seen = {}
+            self.live = 0
+            self.replayed = 0
+            self.recorded_latency = 0.0
+
+    @staticmethod
+    def key(request: dict):
+        body = {k: v for k, v in request.items() if k not in ("api_base", "api_key", "request_timeout")}
+        return hashlib.sha1(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def wrap(self, create):
+        def recorded_create(**request):
+            key = self.key(request)
+            with self._lock:
+                n = self.seen.get(key, 0)
+                self.seen[key] = n + 1
+                hits = self.store.get(key, [])
+                if n < len(hits):
+                    self.replayed += 1
+                    self.recorded_latency += hits[n]["latency_s"]
+                    return hits[n]["response"]
+            if self.mode == "replay-only":
+                raise RuntimeError(f"No recorded response for request {key[:12]} (replay-only)")
+            started = time.perf_counter()
+            resp = create(**request)
+            latency = time.perf_counter() - started
+            entry = {"key": key, "latency_s": round(latency, 4), "response": json.loads(json.dumps(resp))}
+            with self._lock:
+                self.live += 1
+                self.recorded_latency += latency
+                self.store.setdefault(key, []).append(entry)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            return resp
+        return recorded_create
+
+
+# ---------- Agreement ----------
+def ranks(values):
+    """Average ranks (1-based), ties sharing the mean of their positions."""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    out = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            out[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return out
+
+
+def spearman(xs, ys):
+    """Spearman rank correlation, or None with fewer than 3 points or no variation."""
+    if len(xs) < 3:
+        return None
+    rx, ry = ranks(xs), ranks(ys)
+    mx, my = sum(rx) / len(rx), sum(ry) / len(ry)
+    cov = sum((a - mx) * (b - my) for a, b in zip(rx, ry))
+    vx = sum((a - mx) ** 2 for a in rx)
+    vy = sum((b - my) ** 2 for b in ry)
+    if not vx or not vy:
+        return None
+    return cov / (vx * vy) ** 0.5
+
+
+def metric_scores(record: dict):
+    """{metric: score} for applicable, successfully scored metrics of one eval record."""
+    out = {}
+    for details in record.get("sections", {}).values():
+        for m in details.get("metrics", []):
+            if m.get("applicable", True) and not m.get("error"):
+                out[m["name"]] = m["score"]
+    return out
+
+
+def agreement(baseline: dict, candidate: dict):
+    """Per-metric MAE, final-score MAE and Spearman rho of a candidate run against the baseline."""
+    names = sorted(set(baseline) & set(candidate))
+    per_metric = {}
+    for name in names:
+        a, b = metric_scores(baseline[name]), metric_scores(candidate[name])
+        for metric in set(a) & set(b):
+            per_metric.setdefault(metric, []).append(abs(a[metric] - b[metric]))
+    finals_a = [baseline[n]["aggregated"]["final_weighted_score"] for n in names]
+    finals_b = [candidate[n]["aggregated"]["final_weighted_score"] for n in names]
+    rho = spearman(finals_a, finals_b)
+    return {
+        "transcripts": len(names),
+        "metric_mae": {m: round(sum(v) / len(v), 3) for m, v in sorted(per_metric.items())},
+        "final_mae": round(sum(abs(a - b) for a, b in zip(finals_a, finals_b)) / len(names), 3) if names else None,
+        "spearman": round(rho, 4) if rho is not None else None
+    }
+
+
+# ---------- Runner ----------
+def run_config(name: str, overrides: dict, transcripts_dir: Path, recorder: Recorder):
+    """Evaluate the reference set with one configuration; returns (records, cost summary)."""
+    from voicebot_eval.config import Config
+    from voicebot_eval.hybrid import HybridEvaluator
+
+    out_dir = Path(tempfile.mkdtemp(prefix=f"agreement-{name}-"))
+    config = Config.from_env(**overrides).with_overrides(transcripts_dir=str(transcripts_dir), out_dir=str(out_dir))
+    evaluator = HybridEvaluator(config)
+    recorder.reset()
+    print(f"\n[INFO] Configuration '{name}': {json.dumps(overrides)}")
+    started = time.perf_counter()
+    evaluator.run()
+    wall = time.perf_counter() - started
+
+    records = {}
+    for path in out_dir.glob("*.eval.json"):
+        record = json.loads(path.read_text(encoding="utf-8"))
+        records[record["transcript_filename"]] = record
+    shutil.rmtree(out_dir, ignore_errors=True)
+
+    models = evaluator.model_stats.summary()["models"].values()
+    cost = {
+        "calls": sum(m["calls"] for m in models),
+        "live_calls": recorder.live,
+        "replayed_calls": recorder.replayed,
+        "prompt_tokens": sum(m["prompt_tokens"] for m in models),
+        "completion_tokens": sum(m["completion_tokens"] for m in models),
+        "cost_usd": round(sum(m["cost_usd"] for m in models), 4),
+        "wall_s": round(wall, 2),
+        "recorded_llm_s": round(recorder.recorded_latency, 2)
+    }
+    return records, cost
+
+
+def run(args):
+    sys.path.insert(0, str(ROOT))
+    import openai
+
+    configs = json.loads(args.configs.read_text(encoding="utf-8"))
+    if args.baseline not in configs:
+        raise SystemExit(f"[ERROR] Baseline configuration '{args.baseline}' not found in {args.configs}")
+    names = [args.baseline] + [n for n in configs if n != args.baseline]
+    if args.only:
+        names = [args.baseline] + [n for n in names if n in args.only and n != args.baseline]
+
+    recorder = Recorder(args.recordings, args.record)
+    openai.ChatCompletion.create = recorder.wrap(openai.ChatCompletion.create)
+
+    transcripts_dir = Path(tempfile.mkdtemp(prefix="agreement-ref-"))
+    try:
+        pinned = materialize(args.reference, transcripts_dir)
+        print(f"Reference set: {len(pinned)} transcript(s); configurations: {', '.join(names)}")
+        results = {}
+        for name in names:
+            records, cost = run_config(name, configs[name], transcripts_dir, recorder)
+            results[name] = {"records": records, "cost": cost}
+    finally:
+        shutil.rmtree(transcripts_dir, ignore_errors=True)
+
+    baseline = results[args.baseline]["records"]
+    report = {}
+    for name in names:
+        report[name] = {
+            "config": configs[name],
+            "cost": results[name]["cost"],
+            "agreement": agreement(baseline, results[name]["records"]),
+            "missing": sorted(set(pinned) - set(results[name]["records"]))
+        }
+        a = report[name]["agreement"]
+        worst = max(a["metric_mae"].values(), default=0.0)
+        report[name]["within_tolerance"] = (
+            not report[name]["missing"]
+            and a["final_mae"] is not None and a["final_mae"] <= args.max_final_mae
+            and worst <= args.max_metric_mae
+            and (a["spearman"] is None or a["spearman"] >= args.min_spearman)
+        )
+
+    print_report(report, args.baseline)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nReport written to {args.out}")
+
+
+def print_report(report: dict, baseline: str):
+    print(f"\n{'config':<20} {'calls':>6} {'live':>6} {'tokens':>10} {'cost$':>8} {'wall_s':>7} "
+          f"{'final_mae':>9} {'spearman':>8} {'worst_metric_mae':>22}  ok")
+    for name, r in report.items():
+        c, a = r["cost"], r["agreement"]
+        worst = max(a["metric_mae"].items(), key=lambda kv: kv[1], default=("-", 0.0))
+        tokens = c["prompt_tokens"] + c["completion_tokens"]
+        rho = "n/a" if a["spearman"] is None else f"{a['spearman']:.3f}"
+        print(f"{name:<20} {c['calls']:>6} {c['live_calls']:>6} {tokens:>10} {c['cost_usd']:>8} {c['wall_s']:>7} "
+              f"{a['final_mae']!s:>9} {rho:>8} {worst[0] + '=' + str(worst[1]):>22}  "
+              f"{'yes' if r['within_tolerance'] else 'NO'}")
+        for missing in r["missing"]:
+            print(f"[WARN] {name}: no result for {missing}")
+
+    candidates = [(n, r) for n, r in report.items() if n != baseline and r["within_tolerance"]]
+    if candidates:
+        best, r = min(candidates, key=lambda nr: (nr[1]["cost"]["cost_usd"],
+                                                  nr[1]["cost"]["prompt_tokens"] + nr[1]["cost"]["completion_tokens"]))
+        print(f"\n[SUCCESS] Cheapest configuration within tolerance: {best}")
+    else:
+        print("\n[WARN] No configuration stays within tolerance of the baseline.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    pin_p = sub.add_parser("pin", help="Pin a transcript directory as the reference set")
+    pin_p.add_argument("transcripts_dir", type=Path)
+    pin_p.add_argument("--out", type=Path, default=ROOT / "benchmarks" / "reference_set.json")
+    run_p = sub.add_parser("run", help="Run every configuration over the reference set and compare")
+    run_p.add_argument("--reference", type=Path, default=ROOT / "benchmarks" / "reference_set.json")
+    run_p.add_argument("--configs", type=Path, default=ROOT / "benchmarks" / "agreement_configs.json")
+    run_p.add_argument("--baseline", default="baseline", help="Configuration the others are compared against")
+    run_p.add_argument("--only", nargs="+", help="Only run these configurations (plus the baseline)")
+    run_p.add_argument("--recordings", type=Path, default=ROOT / "benchmarks" / "recordings.jsonl")
+    run_p.add_argument("--record", choices=("reuse", "replay-only", "refresh"), default="reuse",
+                       help="reuse recorded responses (default), never call the API, or re-record everything")
+    run_p.add_argument("--max-final-mae", type=float, default=3.0, help="Tolerance on final_weighted_score (points)")
+    run_p.add_argument("--max-metric-mae", type=float, default=1.0, help="Tolerance on any single metric")
+    run_p.add_argument("--min-spearman", type=float, default=0.9, help="Minimum rank correlation of final scores")
+    run_p.add_argument("--out", type=Path, default=ROOT / "benchmarks" / "results" / "agreement.json")
+    args = parser.parse_args()
+
+    if args.command == "pin":
+        pin(args.transcripts_dir, args.out)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+- Import time of the library and each evaluator module (fresh interpreter per sample)
+- Construction time of a HybridEvaluator
+- First-call and warm-call latency of voicebot_eval.evaluate (only when credentials are set)
+
+Usage: python benchmarks/startup.py [--repeat 5] [--transcript transcripts/1.txt]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ["voicebot_eval", "voicebot_eval.hybrid", "evaluator", "evaluator1"]
+
+
+def import_time(module: str, repeat: int):
+    """Median wall time (ms) of `python -c "import <module>"`, minus bare interpreter startup."""
+    def sample(code):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        return elapsed
+
+    baseline = statistics.median(sample("pass") for _ in range(repeat))
+    return statistics.median(sample(f"import {module}") for _ in range(repeat)) - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--transcript", type=Path, help="Transcript used for the first-call measurement")
+    args = parser.parse_args()
+
+    print("Import time (median, ms, excluding interpreter startup):")
+    for module in MODULES:
+        try:
+            print(f"  {module:<22} {import_time(module, args.repeat):8.1f}")
+        except RuntimeError as e:
+            print(f"  {module:<22}   failed: {e}")
+
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    from voicebot_eval import Config, evaluate, get_evaluator
+
+    config = Config.from_env()
+    started = time.perf_counter()
+    get_evaluator(config)
+    print(f"\nEvaluator construction: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    if not config.api_key or not config.api_base:
+        print("First-call latency: skipped (OPENAI_API_KEY / OPENAI_API_BASE not set)")
+        return
+    transcript = args.transcript or next(iter(sorted(Path("transcripts").glob("*.txt"))), None)
+    if transcript is None:
+        print("First-call latency: skipped (no transcript found)")
+        return
+    text = transcript.read_text(encoding="utf-8")
+    for label in ("First call", "Warm call"):
+        started = time.perf_counter()
+        evaluate(text, config, name=transcript.name)
+        print(f"{label} latency ({transcript.name}): {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,23 +12,37 @@ import json
 import time
 import re
 from pathlib import Path
-from dotenv import load_dotenv
-from tqdm import tqdm
-import openai
 # from openai import OpenAI
 
-openai.api_key = "sandlogic"
-openai.api_base = "http://45.194.2.204:3535/v1"
+from voicebot_eval.endpoint_pool import endpoints_from_env, pool_from_env
+from voicebot_eval.normalize import normalize_transcript, parse_steps
+from voicebot_eval.triage import TRIAGE_METRICS, triage
+from voicebot_eval.rollups import GRANULARITIES, RollupStore
+from voicebot_eval import profiling
+from voicebot_eval.profiling import span, timed
 
 
 # ---------- Config ----------
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-MODEL = os.getenv("OPENAI_MODEL", "gpt-5")  # change if needed
-if not OPENAI_API_KEY:
-    raise RuntimeError("Set OPENAI_API_KEY in .env")
-
-openai.api_key = OPENAI_API_KEY
+# openai, dotenv and tqdm are imported on first use so importing this module stays cheap
+_settings = None
+
+
+def settings():
+    """Load .env and configure the OpenAI client once, on first use."""
+    global _settings
+    if _settings is None:
+        from dotenv import load_dotenv
+        import openai
+
+        load_dotenv()
+        api_key = os.getenv("OPENAI_API_KEY")
+        api_base = os.getenv("OPENAI_API_BASE")
+        if not api_key or not (api_base or endpoints_from_env()):
+            raise RuntimeError("Set OPENAI_API_KEY and OPENAI_API_BASE (or ENDPOINT_POOL) in .env")
+        openai.api_key = api_key
+        openai.api_base = api_base
+        _settings = {"model": os.getenv("OPENAI_MODEL", "gpt-5")}  # change if needed
+    return _settings
 
 # Weights for aggregation (final score out of 100)
 WEIGHTS = {
@@ -43,9 +57,9 @@ WEIGHTS = {
 TRANSCRIPTS_DIR = Path("transcripts")
 GOLD_DIR = Path("gold_flows")
 OUT_DIR = Path("evaluations")
-OUT_DIR.mkdir(exist_ok=True)
 
 # ---------- Utilities ----------
+@timed("parse")
 def extract_json(text: str):
     """Attempt to extract JSON object from LLM text output robustly."""
     # First try to find a full {...} JSON blob in text.
@@ -77,6 +91,11 @@ def extract_json(text: str):
 
 def llm_call(system_prompt: str, user_prompt: str, max_retries=2, temperature=0.2):
     """Call the OpenAI chat/completions endpoint (chat completion style)"""
+    import openai
+
+    model = settings()["model"]
+    pool = pool_from_env()
+    create = pool.wrap(openai.ChatCompletion.create) if pool is not None else openai.ChatCompletion.create
     # Build messages
     messages = [
         {"role": "system", "content": system_prompt},
@@ -84,12 +103,13 @@ def llm_call(system_prompt: str, user_prompt: str, max_retries=2, temperature=0.
     ]
     for attempt in range(max_retries + 1):
         try:
-            resp = openai.ChatCompletion.create(
-                model=MODEL,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=1000
-            )
+            with span("llm_call", cat="llm", model=model, attempt=attempt):
+                resp = create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=1000
+                )
             text = resp["choices"][0]["message"]["content"].strip()
             return text
         except Exception as e:
@@ -173,6 +193,16 @@ def load_gold_flows(gold_dir=GOLD_DIR):
         flows[key] = p.read_text(encoding="utf-8")
     return flows
 
+_gold_flows = None
+
+
+def gold_flows():
+    """Gold flows loaded once, on first use."""
+    global _gold_flows
+    if _gold_flows is None:
+        _gold_flows = load_gold_flows()
+    return _gold_flows
+
 def classify_scenario(transcript: str, gold_keys):
     """
     Use LLM to classify which gold scenario the transcript best matches.
@@ -234,7 +264,18 @@ def compare_with_ground_truth(transcript: str, gold_text: str):
     return parsed
 
 # ---------- Aggregator ----------
-def aggregate(quality, business, experience, compliance, gt_similarity_obj):
+def applicable_metrics(tri):
+    """Metric names that apply to a triaged call, or None when every metric applies."""
+    if tri is None or tri["label"] == "full":
+        return None
+    return set(TRIAGE_METRICS.get(tri["label"], []))
+
+def aggregate(quality, business, experience, compliance, gt_similarity_obj, applicable=None):
+    """Section percentages and the weighted final score.
+
+    With `applicable` (see applicable_metrics) only those metrics are averaged; sections with
+    none, and a skipped gold comparison, are left out and the remaining weights rescaled.
+    """
     # Sum raw scores to a 0..raw_max scale as designed earlier
     # Maxes by metric:
     maxes = {
@@ -253,62 +294,43 @@ def aggregate(quality, business, experience, compliance, gt_similarity_obj):
         "closing": 5,
         "overall_similarity": 100  # for ground-truth entry
     }
+    sections = {
+        "quality": (quality, ("intent_understanding", "response_relevance", "context_continuity")),
+        "business": (business, ("conversion_accuracy", "upsell_emi", "escalation_accuracy")),
+        "experience": (experience, ("empathy_tone", "interruption_handling", "politeness_clarity")),
+        "compliance": (compliance, ("introduction", "verification", "rules_compliance", "closing"))
+    }
 
-    # normalize each section to 0-1 then apply WEIGHTS to sum to 100
-    # Quality section
-    quality_score_raw = (
-        quality.get("intent_understanding", 0) / maxes["intent_understanding"] +
-        quality.get("response_relevance", 0) / maxes["response_relevance"] +
-        quality.get("context_continuity", 0) / maxes["context_continuity"]
-    ) / 3.0  # average 0-1
-    quality_pct = quality_score_raw * 100
-
-    # Business section
-    business_score_raw = (
-        business.get("conversion_accuracy", 0) / maxes["conversion_accuracy"] +
-        business.get("upsell_emi", 0) / maxes["upsell_emi"] +
-        business.get("escalation_accuracy", 0) / maxes["escalation_accuracy"]
-    ) / 3.0
-    business_pct = business_score_raw * 100
-
-    # Experience
-    experience_score_raw = (
-        experience.get("empathy_tone", 0) / maxes["empathy_tone"] +
-        experience.get("interruption_handling", 0) / maxes["interruption_handling"] +
-        experience.get("politeness_clarity", 0) / maxes["politeness_clarity"]
-    ) / 3.0
-    experience_pct = experience_score_raw * 100
-
-    # Compliance
-    compliance_score_raw = (
-        compliance.get("introduction", 0) / maxes["introduction"] +
-        compliance.get("verification", 0) / maxes["verification"] +
-        compliance.get("rules_compliance", 0) / maxes["rules_compliance"] +
-        compliance.get("closing", 0) / maxes["closing"]
-    ) / 4.0
-    compliance_pct = compliance_score_raw * 100
+    # normalize each section to 0-1 (average of its metrics) then apply WEIGHTS to sum to 100
+    pct = {}
+    for section, (scores, names) in sections.items():
+        names = [n for n in names if applicable is None or n in applicable]
+        pct[section] = sum(scores.get(n, 0) / maxes[n] for n in names) / len(names) * 100 if names else None
 
     # Ground truth overall_similarity expected as 0..100
-    gt_overall = gt_similarity_obj.get("overall_similarity", 0)
-    gt_pct = max(0, min(100, int(gt_overall)))  # clamp
-
-    # Weighted sum
-    final_score = (
-        WEIGHTS["quality"] * quality_pct +
-        WEIGHTS["business"] * business_pct +
-        WEIGHTS["experience"] * experience_pct +
-        WEIGHTS["compliance"] * compliance_pct +
-        WEIGHTS["ground_truth_similarity"] * gt_pct
+    if gt_similarity_obj.get("applicable") is False:
+        pct["ground_truth_similarity"] = None
+    else:
+        gt_overall = gt_similarity_obj.get("overall_similarity", 0)
+        pct["ground_truth_similarity"] = max(0, min(100, int(gt_overall)))  # clamp
+
+    # Weighted sum over the parts that apply, rescaled to the full weight
+    used = sum(WEIGHTS[k] for k, v in pct.items() if v is not None)
+    final_score = sum(WEIGHTS[k] * v for k, v in pct.items() if v is not None)
+    if used:
+        final_score *= sum(WEIGHTS.values()) / used
+    quality_pct, business_pct, experience_pct, compliance_pct, gt_pct = (
+        pct["quality"], pct["business"], pct["experience"], pct["compliance"], pct["ground_truth_similarity"]
     )
 
     # Build aggregated report
     report = {
         "per_section_pct": {
-            "quality_pct": round(quality_pct, 2),
-            "business_pct": round(business_pct, 2),
-            "experience_pct": round(experience_pct, 2),
-            "compliance_pct": round(compliance_pct, 2),
-            "ground_truth_pct": round(gt_pct, 2)
+            "quality_pct": round2(quality_pct),
+            "business_pct": round2(business_pct),
+            "experience_pct": round2(experience_pct),
+            "compliance_pct": round2(compliance_pct),
+            "ground_truth_pct": round2(gt_pct)
         },
         "final_score": round(final_score, 2),
         "details": {
@@ -321,34 +343,71 @@ def aggregate(quality, business, experience, compliance, gt_similarity_obj):
     }
     return report
 
+def round2(value):
+    return round(value, 2) if value is not None else None
+
 # ---------- Main evaluation runner ----------
 def evaluate_transcript_file(transcript_path: Path, gold_flows: dict):
-    transcript_text = transcript_path.read_text(encoding="utf-8")
-
-    # 1. Run modular evaluations
-    quality = evaluate_quality(transcript_text)
-    business = evaluate_business(transcript_text)
-    experience = evaluate_experience(transcript_text)
-    compliance = evaluate_compliance(transcript_text)
+    with span("read"):
+        transcript_text = transcript_path.read_text(encoding="utf-8")
+
+    # 0. Triage first so trivial calls skip the sections and gold comparison that don't apply
+    tri = None
+    if os.getenv("TRIAGE", "off").lower() != "off":
+        with span("triage"):
+            tri = triage(transcript_text)
+    triaged = tri is not None and tri["label"] != "full"
+    applicable = applicable_metrics(tri)
+
+    norm = None
+    steps = parse_steps(os.getenv("NORMALIZE", ""))
+    if steps:
+        with span("normalize"):
+            norm = normalize_transcript(transcript_text, steps)
+        transcript_text = norm.text
+
+    # 1. Run modular evaluations (one call per section that has an applicable metric)
+    section_calls = {
+        "quality": (evaluate_quality, ("intent_understanding", "response_relevance", "context_continuity")),
+        "business": (evaluate_business, ("conversion_accuracy", "upsell_emi", "escalation_accuracy")),
+        "experience": (evaluate_experience, ("empathy_tone", "interruption_handling", "politeness_clarity")),
+        "compliance": (evaluate_compliance, ("introduction", "verification", "rules_compliance", "closing"))
+    }
+    results = {}
+    for section, (evaluate_section, names) in section_calls.items():
+        if applicable is not None and not applicable.intersection(names):
+            results[section] = {"applicable": False, "comments": f"Not applicable (triage: {tri['label']})."}
+            continue
+        with span("section", section=section):
+            results[section] = evaluate_section(transcript_text)
+    quality, business, experience, compliance = (
+        results["quality"], results["business"], results["experience"], results["compliance"]
+    )
 
-    # 2. Ground-truth classification & comparison
+    # 2. Ground-truth classification & comparison (skipped for calls triaged as trivial)
     gold_keys = list(gold_flows.keys())
-    selected_label = classify_scenario(transcript_text, gold_keys)
-    if selected_label != "unknown":
-        gt_obj = compare_with_ground_truth(transcript_text, gold_flows[selected_label])
+    with span("classify"):
+        selected_label = f"triaged:{tri['label']}" if triaged else classify_scenario(transcript_text, gold_keys)
+    if selected_label in gold_flows:
+        with span("gold_compare", gold=selected_label):
+            gt_obj = compare_with_ground_truth(transcript_text, gold_flows[selected_label])
     else:
-        # fallback: if unknown, create neutral ground-truth object
+        # fallback: if unknown or triaged, create neutral ground-truth object
         gt_obj = {
             "structure_similarity": 0,
             "content_coverage": 0,
             "tone_match": 0,
             "intent_alignment": 0,
             "overall_similarity": 0,
-            "key_deviations": "No similar gold flow found (classification=unknown)."
+            **({"applicable": False} if triaged else {}),
+            "key_deviations": (
+                f"Gold flow comparison skipped (triage: {tri['label']}, {tri['reason']})." if triaged
+                else "No similar gold flow found (classification=unknown)."
+            )
         }
 
     # 3. Aggregate
-    agg = aggregate(quality, business, experience, compliance, gt_obj)
+    agg = aggregate(quality, business, experience, compliance, gt_obj, applicable)
 
     # 4. Save
     output = {
@@ -362,26 +421,81 @@ def evaluate_transcript_file(transcript_path: Path, gold_flows: dict):
             "compliance": compliance,
             "ground_truth_comparison": gt_obj
         },
-        "aggregated": agg
+        "aggregated": agg,
+        "weights": dict(WEIGHTS)
     }
-
+    if os.getenv("BOT_VERSION"):
+        output["bot_version"] = os.getenv("BOT_VERSION")
+    if norm is not None:
+        output["normalization"] = norm.stats()
+    if tri is not None:
+        output["triage"] = tri
+
+    OUT_DIR.mkdir(exist_ok=True)
     out_path = OUT_DIR / (transcript_path.stem + ".eval.json")
-    out_path.write_text(json.dumps(output, indent=2), encoding="utf-8")
+    if rollups_enabled():
+        # before the write, so the "rolled_up" stamp is saved; a re-run replaces the earlier contribution
+        previous = json.loads(out_path.read_text(encoding="utf-8")) if out_path.is_file() else None
+        RollupStore(OUT_DIR / "rollups.db").replace(previous, output)
+    with span("write", file=out_path.name):
+        out_path.write_text(json.dumps(output, indent=2), encoding="utf-8")
     return output
 
+def rollups_enabled():
+    return os.getenv("ROLLUPS", "0").lower() in ("1", "true", "yes")
+
+def write_rollup_feeds():
+    """Write evaluations/rollups/<granularity>.json trend feeds."""
+    store = RollupStore(OUT_DIR / "rollups.db")
+    feed_dir = OUT_DIR / "rollups"
+    feed_dir.mkdir(parents=True, exist_ok=True)
+    for granularity in GRANULARITIES:
+        (feed_dir / f"{granularity}.json").write_text(json.dumps(store.feed(granularity)), encoding="utf-8")
+    print(f"Rollup feeds written to {feed_dir}/")
+
+def recompute():
+    """Re-aggregate saved evaluations with the current WEIGHTS (no LLM calls).
+
+    Section prompts here score every metric of a section in one call, so a prompt change
+    still needs a normal re-run; only weight changes are applied in place.
+    """
+    changed = 0
+    paths = sorted(OUT_DIR.glob("*.eval.json"))
+    for path in paths:
+        output = json.loads(path.read_text(encoding="utf-8"))
+        raw = output.get("raw_evaluations")
+        if not raw or output.get("weights") == WEIGHTS:
+            continue
+        previous = json.loads(json.dumps(output))
+        output["aggregated"] = aggregate(
+            raw["quality"], raw["business"], raw["experience"], raw["compliance"], raw["ground_truth_comparison"],
+            applicable_metrics(output.get("triage"))
+        )
+        output["weights"] = dict(WEIGHTS)
+        output["recomputed_at"] = int(time.time())
+        if rollups_enabled():
+            RollupStore(OUT_DIR / "rollups.db").replace(previous, output)
+        path.write_text(json.dumps(output, indent=2), encoding="utf-8")
+        changed += 1
+    print(f"Re-aggregated {changed}/{len(paths)} evaluation(s) with current WEIGHTS.")
+
 # ---------- CLI entrypoint ----------
 def main():
-    gold_flows = load_gold_flows()
+    from tqdm import tqdm
+
+    settings()  # fail fast on missing credentials
+    flows = gold_flows()
     transcripts = sorted(TRANSCRIPTS_DIR.glob("*.txt"))
     if not transcripts:
         print("No transcripts found in 'transcripts/' - place .txt files there and re-run.")
         return
 
-    print(f"Loaded {len(gold_flows)} gold flows. Evaluating {len(transcripts)} transcripts...")
+    print(f"Loaded {len(flows)} gold flows. Evaluating {len(transcripts)} transcripts...")
     results = []
     for t in tqdm(transcripts):
         try:
-            out = evaluate_transcript_file(t, gold_flows)
+            with span("transcript", transcript=t.name):
+                out = evaluate_transcript_file(t, flows)
             results.append(out)
         except Exception as e:
             print(f"Failed to evaluate {t.name}: {e}")
@@ -393,6 +507,28 @@ def main():
         score = r["aggregated"]["final_score"]
         label = r["selected_gold_label"]
         print(f"- {fname}: final_score={score}, gold_label={label}")
+    pool = pool_from_env()
+    if pool is not None:
+        pool.report()
+        pool.close()
+    if rollups_enabled() and results:
+        write_rollup_feeds()
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Modular voicebot evaluator with gold-flow comparison")
+    parser.add_argument("command", nargs="?", choices=("run", "recompute"), default="run")
+    parser.add_argument("--profile", metavar="TRACE_JSON",
+                        help="Record stage timings and write a Chrome/Perfetto trace to this path")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+    try:
+        if args.command == "recompute":
+            recompute()
+        else:
+            main()
+    finally:
+        if args.profile:
+            profiling.finish(args.profile)
@@ -11,9 +11,12 @@ import json
 import time
 import re
 from pathlib import Path
-from dotenv import load_dotenv
-from tqdm import tqdm
-import openai
+
+from voicebot_eval.endpoint_pool import endpoints_from_env, pool_from_env
+from voicebot_eval.normalize import normalize_transcript, parse_steps
+from voicebot_eval.structured_output import MODES, ParseStats, parse_structured, request_params, section_schema
+from voicebot_eval import profiling
+from voicebot_eval.profiling import span, timed
 
 
 # ---------- Utility Functions ----------
@@ -31,6 +34,7 @@ def clean_json_string(raw: str):
     return raw
 
 
+@timed("parse")
 def extract_json(text: str):
     """Extract JSON object robustly."""
     match = re.search(r"\{.*\}", text, flags=re.DOTALL)
@@ -47,20 +51,26 @@ def extract_json(text: str):
         raise
 
 
-def llm_call(system_prompt: str, user_prompt: str, model: str, temperature=0.2, max_retries=2):
-    """Call LLM with retries."""
+def llm_call(system_prompt: str, user_prompt: str, model: str, temperature=0.2, max_retries=2, **params):
+    """Call LLM with retries. Extra params (e.g. response_format) are passed through."""
+    import openai  # deferred: keeps importing this module cheap
+
+    pool = pool_from_env()
+    create = pool.wrap(openai.ChatCompletion.create) if pool is not None else openai.ChatCompletion.create
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
     ]
     for attempt in range(max_retries + 1):
         try:
-            resp = openai.ChatCompletion.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=1000
-            )
+            with span("llm_call", cat="llm", model=model, attempt=attempt):
+                resp = create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=1000,
+                    **params
+                )
             return resp["choices"][0]["message"]["content"].strip()
         except Exception as e:
             print(f"[ERROR] LLM call failed (attempt {attempt+1}): {e}")
@@ -73,18 +83,29 @@ def llm_call(system_prompt: str, user_prompt: str, model: str, temperature=0.2,
 # ---------- Main Evaluator ----------
 class VoicebotEvaluator:
     def __init__(self):
+        from dotenv import load_dotenv
+        import openai
+
         load_dotenv()
 
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.api_base = os.getenv("OPENAI_API_BASE")
         self.model = os.getenv("OPENAI_MODEL", "gpt-4-turbo")
 
-        if not self.api_key or not self.api_base:
+        if not self.api_key or not (self.api_base or endpoints_from_env()):
             raise RuntimeError("Missing OPENAI_API_KEY or OPENAI_API_BASE in .env file")
 
         openai.api_key = self.api_key
         openai.api_base = self.api_base
 
+        # Structured output: "off" (prompt + regex repair), "openai" (response_format) or "vllm" (guided_json)
+        self.structured_mode = os.getenv("STRUCTURED_OUTPUT", "off").lower()
+        if self.structured_mode not in MODES:
+            raise RuntimeError(f"STRUCTURED_OUTPUT must be one of {', '.join(MODES)}")
+        self.parse_retries = int(os.getenv("PARSE_RETRIES", "1"))
+        self.parse_stats = ParseStats()
+        self.normalize_steps = parse_steps(os.getenv("NORMALIZE", ""))
+
         self.WEIGHTS = {
             "quality": 0.35,
             "business": 0.30,
@@ -94,7 +115,6 @@ class VoicebotEvaluator:
 
         self.TRANSCRIPTS_DIR = Path("transcripts")
         self.OUT_DIR = Path("evaluations")
-        self.OUT_DIR.mkdir(exist_ok=True)
 
         self.METRICS = {
             "quality": [
@@ -147,10 +167,23 @@ class VoicebotEvaluator:
         metrics = self.METRICS[section_name]
         system = f"You are an expert evaluator assessing the {section_name} performance of a Maruti Suzuki voicebot."
         prompt = self.build_prompt(section_name, metrics, transcript)
-        print(f"[DEBUG] Calling LLM for section: {section_name}")
-        raw = llm_call(system, prompt, model=self.model)
-        raw = clean_json_string(raw)
-        parsed = extract_json(raw)
+        params = request_params(self.structured_mode, section_name, section_schema(metrics))
+        for attempt in range(self.parse_retries + 1):
+            print(f"[DEBUG] Calling LLM for section: {section_name}")
+            self.parse_stats.record_call(recall=attempt > 0)
+            raw = llm_call(system, prompt, model=self.model, **params)
+            try:
+                if self.structured_mode != "off":
+                    with span("parse", structured=True):
+                        parsed = parse_structured(raw)
+                else:
+                    parsed = extract_json(clean_json_string(raw))
+                break
+            except ValueError as e:
+                self.parse_stats.record_failure()
+                if attempt == self.parse_retries:
+                    raise
+                print(f"[WARN] {section_name}: unparseable response, re-calling ({e})")
         print(f"[DEBUG] Parsed JSON for {section_name}: {list(parsed.keys())}")
         return parsed
 
@@ -175,11 +208,18 @@ class VoicebotEvaluator:
 
     def evaluate_transcript(self, path):
         print(f"\n[INFO] Evaluating transcript: {path.name}")
-        text = path.read_text(encoding="utf-8")
+        with span("read"):
+            text = path.read_text(encoding="utf-8")
+        with span("normalize"):
+            norm = normalize_transcript(text, self.normalize_steps) if self.normalize_steps else None
+        if norm is not None:
+            text = norm.text
+            print(f"[INFO] Normalized: {norm.stats()['tokens_before']} -> {norm.stats()['tokens_after']} tokens")
         results = {}
         for section in self.METRICS.keys():
             try:
-                results[section] = self.evaluate_section(section, text)
+                with span("section", section=section):
+                    results[section] = self.evaluate_section(section, text)
             except Exception as e:
                 print(f"[ERROR] Failed {section}: {e}")
                 results[section] = {}
@@ -191,12 +231,18 @@ class VoicebotEvaluator:
             "raw_evaluations": results,
             "aggregated": agg
         }
+        if norm is not None:
+            out["normalization"] = norm.stats()
+        self.OUT_DIR.mkdir(exist_ok=True)
         out_file = self.OUT_DIR / f"{path.stem}.eval.json"
-        out_file.write_text(json.dumps(out, indent=2), encoding="utf-8")
+        with span("write", file=out_file.name):
+            out_file.write_text(json.dumps(out, indent=2), encoding="utf-8")
         print(f"[SUCCESS] File saved: {out_file}")
         return out
 
     def run(self):
+        from tqdm import tqdm
+
         transcripts = sorted(self.TRANSCRIPTS_DIR.glob("*.txt"))
         if not transcripts:
             print("No transcripts found in transcripts/.")
@@ -205,14 +251,31 @@ class VoicebotEvaluator:
         print(f"Evaluating {len(transcripts)} transcript(s)...\n")
         results = []
         for t in tqdm(transcripts):
-            results.append(self.evaluate_transcript(t))
+            with span("transcript", transcript=t.name):
+                results.append(self.evaluate_transcript(t))
 
         print("\nDone. Results saved in 'evaluations/' directory.\n")
         for r in results:
             print(f"- {r['transcript_filename']}: Final Score = {r['aggregated']['final_score']}")
+        self.parse_stats.report(self.structured_mode)
+        pool = pool_from_env()
+        if pool is not None:
+            pool.report()
 
 
 # ---------- Entrypoint ----------
 if __name__ == "__main__":
-    evaluator = VoicebotEvaluator()
-    evaluator.run()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Section-level LLM-as-a-judge voicebot evaluator")
+    parser.add_argument("--profile", metavar="TRACE_JSON",
+                        help="Record stage timings and write a Chrome/Perfetto trace to this path")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+    try:
+        evaluator = VoicebotEvaluator()
+        evaluator.run()
+    finally:
+        if args.profile:
+            profiling.finish(args.profile)
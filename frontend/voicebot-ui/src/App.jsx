@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import ReportList from "./components/ReportList";
+import TrendChart from "./components/TrendChart";
 import "./index.css";
 
 export default function App() {
@@ -37,6 +38,7 @@ export default function App() {
         />
       </div>
 
+      <TrendChart />
       <ReportList reports={filtered} />
     </div>
   );
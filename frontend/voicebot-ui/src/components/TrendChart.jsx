@@ -0,0 +1,132 @@
+import React, { useMemo, useState } from "react";
+
+// Rollup feeds written by `eval.py rollups` / ROLLUPS=1 to <OUT_DIR>/rollups/ (one file per granularity).
+// Like the reports, they are read from the copy of evaluations/ under src/results/.
+const FEEDS = Object.fromEntries(
+  Object.entries(import.meta.glob("../results/evaluations/rollups/*.json", { eager: true })).map(
+    ([path, content]) => [path.split("/").pop().replace(".json", ""), content.default || content]
+  )
+);
+
+const COLORS = ["#0f172a", "#0ea5e9", "#10b981", "#f59e0b", "#ef4444", "#8b5cf6", "#ec4899"];
+const WIDTH = 720;
+const HEIGHT = 220;
+const PAD = 32;
+
+// Pool the selected series per bucket: count-weighted mean of every metric
+function pooled(series, label, triage, version) {
+  const buckets = {};
+  for (const s of series) {
+    if (label !== "all" && s.gold_label !== label) continue;
+    if (triage !== "all" && (s.triage_label || "unknown") !== triage) continue;
+    if (version !== "all" && s.bot_version !== version) continue;
+    const bucket = (buckets[s.bucket] = buckets[s.bucket] || {});
+    for (const [metric, v] of Object.entries(s.values)) {
+      const cell = (bucket[metric] = bucket[metric] || { n: 0, sum: 0 });
+      cell.n += v.n;
+      cell.sum += v.mean * v.n;
+    }
+  }
+  return Object.keys(buckets)
+    .sort()
+    .map((bucket) => ({
+      bucket,
+      values: Object.fromEntries(
+        Object.entries(buckets[bucket]).map(([m, c]) => [m, { n: c.n, mean: c.sum / c.n }])
+      ),
+    }));
+}
+
+export default function TrendChart() {
+  const granularities = Object.keys(FEEDS).sort();
+  const [granularity, setGranularity] = useState(granularities.includes("day") ? "day" : granularities[0]);
+  const [label, setLabel] = useState("all");
+  const [triage, setTriage] = useState("all");
+  const [version, setVersion] = useState("all");
+
+  const feed = FEEDS[granularity];
+  const series = feed?.series || [];
+  const labels = useMemo(() => [...new Set(series.map((s) => s.gold_label))].sort(), [series]);
+  const triages = useMemo(() => [...new Set(series.map((s) => s.triage_label || "unknown"))].sort(), [series]);
+  const versions = useMemo(() => [...new Set(series.map((s) => s.bot_version))].sort(), [series]);
+  const points = useMemo(() => pooled(series, label, triage, version), [series, label, triage, version]);
+
+  if (!feed) return null;
+
+  const metrics = feed.metrics || [];
+  const x = (i) => PAD + (points.length > 1 ? (i * (WIDTH - 2 * PAD)) / (points.length - 1) : (WIDTH - 2 * PAD) / 2);
+  const y = (v) => HEIGHT - PAD - (v / 100) * (HEIGHT - 2 * PAD);
+
+  return (
+    <div className="section-card" style={{ marginBottom: 18 }}>
+      <div className="section-header">
+        <div className="section-title">Score trends</div>
+        <div style={{ display: "flex", gap: 8 }}>
+          <select value={granularity} onChange={(e) => setGranularity(e.target.value)}>
+            {granularities.map((g) => (
+              <option key={g} value={g}>{g}</option>
+            ))}
+          </select>
+          <select value={label} onChange={(e) => setLabel(e.target.value)}>
+            <option value="all">all gold labels</option>
+            {labels.map((l) => (
+              <option key={l} value={l}>{l}</option>
+            ))}
+          </select>
+          <select value={triage} onChange={(e) => setTriage(e.target.value)}>
+            <option value="all">all triage labels</option>
+            {triages.map((t) => (
+              <option key={t} value={t}>{t}</option>
+            ))}
+          </select>
+          <select value={version} onChange={(e) => setVersion(e.target.value)}>
+            <option value="all">all bot versions</option>
+            {versions.map((v) => (
+              <option key={v} value={v}>{v}</option>
+            ))}
+          </select>
+        </div>
+      </div>
+
+      {points.length === 0 ? (
+        <p className="muted">No rollups for this selection.</p>
+      ) : (
+        <svg viewBox={`0 0 ${WIDTH} ${HEIGHT}`} style={{ width: "100%" }}>
+          {[0, 25, 50, 75, 100].map((v) => (
+            <g key={v}>
+              <line x1={PAD} x2={WIDTH - PAD} y1={y(v)} y2={y(v)} stroke="#e5e7eb" />
+              <text x={4} y={y(v) + 4} fontSize="10" fill="#6b7280">{v}</text>
+            </g>
+          ))}
+          {points.map((p, i) => (
+            <text key={p.bucket} x={x(i)} y={HEIGHT - 8} fontSize="10" fill="#6b7280" textAnchor="middle">
+              {p.bucket.slice(5)}
+            </text>
+          ))}
+          {metrics.map((metric, m) => {
+            const pts = points
+              .map((p, i) => (p.values[metric] ? `${x(i)},${y(p.values[metric].mean)}` : null))
+              .filter(Boolean);
+            return (
+              <g key={metric} stroke={COLORS[m % COLORS.length]} fill={COLORS[m % COLORS.length]}>
+                <polyline points={pts.join(" ")} fill="none" strokeWidth={metric === "final_weighted_score" ? 2.5 : 1.5} />
+                {pts.map((pt) => {
+                  const [cx, cy] = pt.split(",");
+                  return <circle key={pt} cx={cx} cy={cy} r={2.5} />;
+                })}
+              </g>
+            );
+          })}
+        </svg>
+      )}
+
+      <div style={{ display: "flex", flexWrap: "wrap", gap: 12, fontSize: "0.85rem" }}>
+        {metrics.map((metric, m) => (
+          <span key={metric} style={{ color: COLORS[m % COLORS.length] }}>
+            ■ {metric.replace("section.", "").replace(/_/g, " ")}
+          </span>
+        ))}
+      </div>
+    </div>
+  );
+}
@@ -1,10 +1,31 @@
 // src/VoicebotEvaluationDashboard.jsx
-import React from "react";
+import React, { useState } from "react";
 import data from "./data.json"; // or pass `data` prop
 
+// `python eval.py serve-explain` endpoint for score-only metrics (optional)
+const EXPLAIN_URL = import.meta.env.VITE_EXPLAIN_URL;
+
 export default function VoicebotEvaluationDashboard({ dataProp }) {
   const dataObj = dataProp || data;
   const { transcript_filename, timestamp, sections, aggregated } = dataObj;
+  const [explained, setExplained] = useState({});
+  const [pending, setPending] = useState(null);
+
+  const explain = async (name) => {
+    setPending(name);
+    try {
+      const res = await fetch(`${EXPLAIN_URL}/explain`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ transcript_filename, metric: name }),
+      });
+      const body = await res.json();
+      const entry = (body.explained || [])[0];
+      if (entry) setExplained((prev) => ({ ...prev, [name]: entry }));
+    } finally {
+      setPending(null);
+    }
+  };
 
   return (
     <div className="app-container">
@@ -42,29 +63,56 @@ export default function VoicebotEvaluationDashboard({ dataProp }) {
             <div className="section-header">
               <div className="section-title">{sectionKey}</div>
               <div className="section-badge">
-                {section.total_score}/{section.max_score} ({section.percentage}%)
+                {section.percentage === null
+                  ? "N/A"
+                  : `${section.total_score}/${section.max_score} (${section.percentage}%)`}
               </div>
             </div>
 
             <div style={{ display: "flex", flexDirection: "column", gap: 12 }}>
-              {section.metrics.map((metric) => (
-                <div className="metric" key={metric.name}>
-                  <div className="metric-left">
-                    <div className="metric-name">{metric.name.replace(/_/g, " ")}</div>
-                    <div className="metric-comments">{metric.comments}</div>
-                    {metric.proof ? (
-                      <div className="metric-proof">“{metric.proof}”</div>
-                    ) : (
-                      <div className="muted">No proof available</div>
-                    )}
-                  </div>
+              {section.metrics.map((raw) => {
+                const metric = explained[raw.name] || raw;
+                return (
+                  <div className="metric" key={metric.name}>
+                    <div className="metric-left">
+                      <div className="metric-name">{metric.name.replace(/_/g, " ")}</div>
+                      {metric.explained === false ? (
+                        EXPLAIN_URL ? (
+                          <button
+                            className="muted"
+                            disabled={pending === metric.name}
+                            onClick={() => explain(metric.name)}
+                          >
+                            {pending === metric.name ? "Explaining…" : "Explain score"}
+                          </button>
+                        ) : (
+                          <div className="muted">Score only (run: python eval.py explain {transcript_filename})</div>
+                        )
+                      ) : (
+                        <>
+                          <div className="metric-comments">{metric.comments}</div>
+                          {metric.proof ? (
+                            <div className="metric-proof">“{metric.proof}”</div>
+                          ) : (
+                            <div className="muted">No proof available</div>
+                          )}
+                        </>
+                      )}
+                    </div>
 
-                  <div className="metric-right">
-                    <div className="metric-score">{metric.score}</div>
-                    <div className="metric-max">/ {metric.max}</div>
+                    <div className="metric-right">
+                      {metric.applicable === false ? (
+                        <div className="muted">N/A</div>
+                      ) : (
+                        <>
+                          <div className="metric-score">{metric.score}</div>
+                          <div className="metric-max">/ {metric.max}</div>
+                        </>
+                      )}
+                    </div>
                   </div>
-                </div>
-              ))}
+                );
+              })}
             </div>
           </div>
         ))}
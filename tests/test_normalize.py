@@ -0,0 +1,43 @@
+"""Regression tests for the transcript normalization pre-pass (FILLER_RE and proof mapping)."""
+
+from voicebot_eval.normalize import count_tokens, normalize_transcript
+
+STEPS = ("whitespace", "labels", "fillers", "dedupe", "numbering")
+
+
+def test_backchannels_and_hyphenated_words_are_kept():
+    assert normalize_transcript("Customer: Mm-hmm.").text == "Customer: Mm-hmm."
+    assert normalize_transcript("Customer: Uh-huh, yes yes.").text == "Customer: Uh-huh, yes yes."
+    assert normalize_transcript("Agent: The Ah-series?").text == "Agent: The Ah-series?"
+
+
+def test_standalone_fillers_are_stripped():
+    norm = normalize_transcript("Agent: Uh, hello there.\nAgent: So, um, okay.")
+    assert norm.text == "Agent: hello there. So, okay."
+
+
+def test_filler_only_turn_is_kept():
+    norm = normalize_transcript("Agent: Is this a good time?\nCustomer: Hmm.\nAgent: I can call back.")
+    assert [t["speaker"] for t in norm.turns] == ["Agent", "Customer", "Agent"]
+    assert norm.turns[1]["text"] == "Hmm."
+
+
+def test_normalization_never_adds_tokens():
+    for text in ("Customer: Mm-hmm.", "Customer: Uh-huh, yes yes.", "Agent: The Ah-series?", "Customer: Hmm."):
+        norm = normalize_transcript(text)
+        assert count_tokens(norm.text)[0] <= count_tokens(text)[0]
+
+
+def test_to_original_maps_back_to_source_lines():
+    original = (
+        "Agent: Uh, hello there.\n"
+        "Agent: I'm calling about your, um, renewal.\n"
+        "\n"
+        "Customer: Hmm.\n"
+        "Customer: Mm-hmm, go on."
+    )
+    norm = normalize_transcript(original, STEPS)
+    assert [t["lines"] for t in norm.turns] == [[0, 1], [3, 4]]
+    assert norm.to_original("[T2]") == "Customer: Hmm.\nCustomer: Mm-hmm, go on."
+    assert norm.to_original("Agent: calling about your") == "Agent: Uh, hello there.\nAgent: I'm calling about your, um, renewal."
+    assert norm.to_original("not in the call") == "not in the call"
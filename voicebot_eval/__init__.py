@@ -0,0 +1,12 @@
+"""
+Voicebot evaluator as an importable library.
+
+Importing this package is cheap: it pulls in only the standard library.
+The evaluator, the OpenAI client and `.env` are initialised on first use.
+"""
+
+from .api import Result, aevaluate, evaluate, get_evaluator
+from .config import Config
+from .live import LiveSession
+
+__all__ = ["Config", "Result", "LiveSession", "evaluate", "aevaluate", "get_evaluator"]
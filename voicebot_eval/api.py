@@ -0,0 +1,66 @@
+"""
+In-process evaluation API.
+
+    from voicebot_eval import evaluate, Config
+    result = evaluate(transcript_text, Config.from_env())
+    result.final_weighted_score
+
+The evaluator module, the OpenAI client and `.env` are only loaded on the
+first call; evaluators are cached per Config value, so equal configs (e.g.
+repeated Config.from_env() calls) reuse one evaluator and its thread pools.
+"""
+
+import threading
+from dataclasses import dataclass
+
+from .config import Config
+
+
+@dataclass
+class Result:
+    transcript_filename: str
+    sections: dict
+    aggregated: dict
+    record: dict
+
+    @property
+    def final_weighted_score(self):
+        return self.aggregated.get("final_weighted_score")
+
+    @classmethod
+    def from_record(cls, record: dict):
+        return cls(
+            transcript_filename=record["transcript_filename"],
+            sections=record["sections"],
+            aggregated=record["aggregated"],
+            record=record,
+        )
+
+
+_evaluators = {}
+_lock = threading.Lock()
+
+
+def get_evaluator(config: Config = None):
+    """Return a cached HybridEvaluator for `config` (default: Config.from_env())."""
+    with _lock:
+        evaluator = _evaluators.get(config)
+        if evaluator is None:
+            from .hybrid import HybridEvaluator  # deferred: the heavy module loads on first use
+            evaluator = _evaluators[config] = HybridEvaluator(config)
+    return evaluator
+
+
+def evaluate(text: str, config: Config = None, name: str = "inline.txt", save: bool = False):
+    """Evaluate transcript text and return a Result. With save=True the eval file is also written."""
+    evaluator = get_evaluator(config)
+    record = evaluator.evaluate_text(text, name)
+    if save:
+        evaluator.write_record(record)
+    return Result.from_record(record)
+
+
+async def aevaluate(text: str, config: Config = None, name: str = "inline.txt", save: bool = False):
+    """Async variant of evaluate(); runs the blocking LLM calls in a worker thread."""
+    import asyncio  # deferred: asyncio alone dominates import time
+    return await asyncio.to_thread(evaluate, text, config, name, save)
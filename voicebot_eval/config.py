@@ -0,0 +1,105 @@
+"""
+Evaluator configuration.
+
+Values come from explicit arguments or, via Config.from_env(), from `.env` /
+the environment. Nothing here touches the network or the filesystem beyond
+reading `.env` when from_env() is called.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields, replace
+
+
+@dataclass(frozen=True)
+class Config:
+    api_key: str = None
+    api_base: str = None
+    model: str = "gpt-4-turbo"
+    fast_model: str = None
+    structured_output: str = "off"
+    parse_retries: int = 1
+    workers: int = 4
+    fast_samples: int = 2
+    fast_tolerance: float = 0.2
+    hedge: bool = False
+    hedge_percentile: float = 0.95
+    hedge_budget: float = 0.1
+    hedge_api_base: str = None
+    hedge_api_key: str = None
+    endpoints: tuple = ()
+    pool_strategy: str = "least_outstanding"
+    normalize: str = ""
+    triage: str = "off"
+    pack_tokens: int = 0
+    pack_max: int = 8
+    score_only: bool = False
+    explain_below: float = 0.6
+    adaptive: bool = False
+    max_samples: int = 5
+    sample_tolerance: float = 0.1
+    decision_thresholds: str = "0.5,0.8"
+    threshold_margin: float = 0.05
+    rollups: bool = False
+    bot_version: str = None
+    transcripts_dir: str = "transcripts"
+    out_dir: str = "evaluations"
+    extra: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        # endpoints may be passed as any sequence of dicts; store a tuple so equal configs compare equal
+        object.__setattr__(self, "endpoints", tuple(self.endpoints or ()))
+
+    def __hash__(self):
+        """Hash by value (endpoints and extra hold dicts), so equal configs share a cached evaluator."""
+        return hash(json.dumps(asdict(self), sort_keys=True, default=str))
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """Build a Config from `.env` / environment variables, then apply overrides."""
+        try:
+            from dotenv import load_dotenv
+        except ImportError:  # python-dotenv is optional for library use
+            pass
+        else:
+            load_dotenv()
+        from .endpoint_pool import endpoints_from_env
+        env = cls(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            api_base=os.getenv("OPENAI_API_BASE"),
+            model=os.getenv("OPENAI_MODEL", "gpt-4-turbo"),
+            fast_model=os.getenv("OPENAI_FAST_MODEL"),
+            structured_output=os.getenv("STRUCTURED_OUTPUT", "off").lower(),
+            parse_retries=int(os.getenv("PARSE_RETRIES", "1")),
+            workers=int(os.getenv("EVAL_WORKERS", "4")),
+            fast_samples=int(os.getenv("FAST_SAMPLES", "2")),
+            fast_tolerance=float(os.getenv("FAST_TOLERANCE", "0.2")),
+            hedge=os.getenv("LLM_HEDGE", "0").lower() in ("1", "true", "yes"),
+            hedge_percentile=float(os.getenv("HEDGE_PERCENTILE", "0.95")),
+            hedge_budget=float(os.getenv("HEDGE_BUDGET", "0.1")),
+            hedge_api_base=os.getenv("HEDGE_API_BASE"),
+            hedge_api_key=os.getenv("HEDGE_API_KEY"),
+            endpoints=endpoints_from_env(),
+            pool_strategy=os.getenv("POOL_STRATEGY", "least_outstanding"),
+            normalize=os.getenv("NORMALIZE", ""),
+            triage=os.getenv("TRIAGE", "off").lower(),
+            pack_tokens=int(os.getenv("PACK_TOKENS", "0")),
+            pack_max=int(os.getenv("PACK_MAX", "8")),
+            score_only=os.getenv("SCORE_ONLY", "0").lower() in ("1", "true", "yes"),
+            explain_below=float(os.getenv("EXPLAIN_BELOW", "0.6")),
+            adaptive=os.getenv("ADAPTIVE_SAMPLING", "0").lower() in ("1", "true", "yes"),
+            max_samples=int(os.getenv("MAX_SAMPLES", "5")),
+            sample_tolerance=float(os.getenv("SAMPLE_TOLERANCE", "0.1")),
+            decision_thresholds=os.getenv("DECISION_THRESHOLDS", "0.5,0.8"),
+            threshold_margin=float(os.getenv("THRESHOLD_MARGIN", "0.05")),
+            rollups=os.getenv("ROLLUPS", "0").lower() in ("1", "true", "yes"),
+            bot_version=os.getenv("BOT_VERSION"),
+        )
+        return env.with_overrides(**overrides)
+
+    def with_overrides(self, **overrides):
+        """Copy with some fields replaced; unknown keys go into `extra`."""
+        known = {f.name for f in fields(self)}
+        extra = dict(self.extra)
+        extra.update({k: v for k, v in overrides.items() if k not in known})
+        return replace(self, extra=extra, **{k: v for k, v in overrides.items() if k in known})
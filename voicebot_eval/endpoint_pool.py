@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Endpoint Pool for Self-hosted Inference Replicas
+- Spreads LLM calls over several OpenAI-compatible endpoints (e.g. vLLM replicas)
+- Least-outstanding-requests or latency-weighted balancing
+- Per-endpoint concurrency limits
+- Passive ejection after consecutive failures, active health checks
+  against <api_base>/models, and reinstatement when an endpoint recovers
+
+Configure with ENDPOINT_POOL (JSON list, or a path to a JSON file):
+    [{"api_base": "http://gpu1:8000/v1", "api_key": "x", "max_concurrency": 16}, ...]
+or with OPENAI_API_BASES (comma-separated, sharing OPENAI_API_KEY).
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .profiling import span
+
+
+STRATEGIES = ("least_outstanding", "latency")
+
+
+class Endpoint:
+    def __init__(self, api_base: str, api_key: str = None, max_concurrency: int = 8):
+        self.api_base = api_base.rstrip("/")
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.outstanding = 0
+        self.ewma_latency = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.ejected_by = None  # "failures" (passive) or "health" for the current ejection
+        self.calls = 0
+        self.errors = 0
+        self.ejections = 0
+
+    def available(self, now: float):
+        return self.ejected_until <= now and self.outstanding < self.max_concurrency
+
+    def cost(self, strategy: str):
+        """Lower is better. Ties on outstanding requests go to the least-used endpoint;
+        unmeasured endpoints get a neutral latency so they are tried."""
+        if strategy == "latency":
+            return (self.outstanding + 1) * (self.ewma_latency or 1.0)
+        return (self.outstanding, self.calls)
+
+
+class EndpointPool:
+    def __init__(self, endpoints, strategy="least_outstanding", eject_after=3, eject_seconds=30.0,
+                 health_interval=15.0, acquire_timeout=300.0):
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Pool strategy must be one of {', '.join(STRATEGIES)}")
+        self.endpoints = list(endpoints)
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.acquire_timeout = acquire_timeout
+        self.health_interval = health_interval if len(self.endpoints) > 1 else 0
+        self._cond = threading.Condition()
+        self._health_thread = None  # started by the first acquire(), so building a pool makes no network calls
+        self._stop = threading.Event()
+
+    # ---------- Selection ----------
+    def acquire(self):
+        """Reserve a slot on the best available endpoint, waiting while all are at their limit."""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            self._start_health()
+            while True:
+                now = time.time()
+                candidates = [ep for ep in self.endpoints if ep.available(now)]
+                if not candidates and all(ep.ejected_until > now for ep in self.endpoints):
+                    # everything is ejected: fail open on the endpoint that recovers soonest
+                    soonest = min(self.endpoints, key=lambda ep: ep.ejected_until)
+                    if soonest.outstanding < soonest.max_concurrency:
+                        candidates = [soonest]
+                if candidates:
+                    ep = min(candidates, key=lambda ep: ep.cost(self.strategy))
+                    ep.outstanding += 1
+                    return ep
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No endpoint slot became free")
+                self._cond.wait(timeout=min(remaining, 1.0))
+
+    def release(self, ep: Endpoint, ok: bool, latency: float = None):
+        with self._cond:
+            ep.outstanding -= 1
+            ep.calls += 1
+            if ok:
+                ep.failures = 0
+                if latency is not None:
+                    ep.ewma_latency = latency if ep.ewma_latency is None else 0.8 * ep.ewma_latency + 0.2 * latency
+            else:
+                ep.errors += 1
+                ep.failures += 1
+                if ep.failures >= self.eject_after:
+                    self._eject(ep, "failures")
+            self._cond.notify_all()
+
+    def _eject(self, ep: Endpoint, reason: str):
+        if ep.ejected_until <= time.time():
+            ep.ejections += 1
+            ep.ejected_by = reason
+            print(f"[WARN] Ejecting endpoint {ep.api_base} for {self.eject_seconds:.0f}s ({reason})")
+        ep.ejected_until = time.time() + self.eject_seconds
+        if reason == "failures":
+            # after the ejection window one more failure re-ejects immediately
+            ep.failures = self.eject_after - 1
+
+    def _reinstate(self, ep: Endpoint):
+        print(f"[INFO] Reinstating endpoint {ep.api_base}")
+        ep.ejected_until = 0.0
+        ep.ejected_by = None
+        ep.failures = 0
+
+    # ---------- Calls ----------
+    def call(self, create, request: dict):
+        """Invoke `create(**request)` on a pooled endpoint."""
+        with span("pool_wait", cat="wait"):
+            ep = self.acquire()
+        started = time.perf_counter()
+        try:
+            resp = create(**{**request, "api_base": ep.api_base, "api_key": ep.api_key})
+        except Exception:
+            self.release(ep, ok=False)
+            raise
+        self.release(ep, ok=True, latency=time.perf_counter() - started)
+        return resp
+
+    def wrap(self, create):
+        """`create` with endpoint selection applied, for use wherever a create function is expected."""
+        return lambda **request: self.call(create, request)
+
+    # ---------- Health checks ----------
+    def check(self, ep: Endpoint, timeout: float = 5.0):
+        import urllib.request  # deferred: only needed once health checks run
+
+        req = urllib.request.Request(f"{ep.api_base}/models")
+        if ep.api_key:
+            req.add_header("Authorization", f"Bearer {ep.api_key}")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return 200 <= resp.status < 300
+        except Exception:
+            return False
+
+    def _start_health(self):
+        """Start this pool's health-check thread once (caller holds the lock)."""
+        if self.health_interval and self._health_thread is None and not self._stop.is_set():
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(self.health_interval,), daemon=True, name="pool-health"
+            )
+            self._health_thread.start()
+
+    def close(self):
+        """Stop health checks; the pool still serves calls but no longer probes endpoints."""
+        self._stop.set()
+
+    def _health_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            for ep in self.endpoints:
+                healthy = self.check(ep)
+                with self._cond:
+                    if not healthy:
+                        self._eject(ep, "health")
+                    elif ep.ejected_by == "health" and ep.ejected_until > time.time():
+                        # only a failed health check is lifted early; a replica that serves /models
+                        # but fails completions sits out its passive ejection window
+                        self._reinstate(ep)
+                    self._cond.notify_all()
+
+    # ---------- Stats ----------
+    def summary(self):
+        with self._cond:
+            now = time.time()
+            return [
+                {
+                    "api_base": ep.api_base,
+                    "calls": ep.calls,
+                    "errors": ep.errors,
+                    "ewma_latency_s": round(ep.ewma_latency, 3) if ep.ewma_latency is not None else None,
+                    "ejections": ep.ejections,
+                    "ejected": ep.ejected_until > now
+                }
+                for ep in self.endpoints
+            ]
+
+    def report(self):
+        for s in self.summary():
+            state = "ejected" if s["ejected"] else "up"
+            latency = f"{s['ewma_latency_s']}s" if s["ewma_latency_s"] is not None else "n/a"
+            print(
+                f"[STATS] endpoint={s['api_base']} calls={s['calls']} errors={s['errors']} "
+                f"ewma_latency={latency} ejections={s['ejections']} ({state})"
+            )
+
+
+# ---------- Configuration ----------
+def endpoints_from_env():
+    """Endpoint dicts from ENDPOINT_POOL (JSON or JSON file path) or OPENAI_API_BASES."""
+    raw = os.getenv("ENDPOINT_POOL")
+    if raw:
+        if not raw.lstrip().startswith("[") and Path(raw).is_file():
+            raw = Path(raw).read_text(encoding="utf-8")
+        return json.loads(raw)
+    bases = os.getenv("OPENAI_API_BASES")
+    if bases:
+        key = os.getenv("OPENAI_API_KEY")
+        limit = int(os.getenv("POOL_MAX_CONCURRENCY", "8"))
+        return [{"api_base": b.strip(), "api_key": key, "max_concurrency": limit} for b in bases.split(",") if b.strip()]
+    return []
+
+
+def build_pool(endpoints, strategy=None, health_interval=None, default_key=None):
+    """EndpointPool from endpoint dicts, or None when none are configured."""
+    if not endpoints:
+        return None
+    return EndpointPool(
+        [Endpoint(e["api_base"], e.get("api_key") or default_key, int(e.get("max_concurrency", 8))) for e in endpoints],
+        strategy=strategy or os.getenv("POOL_STRATEGY", "least_outstanding"),
+        health_interval=float(health_interval if health_interval is not None else os.getenv("POOL_HEALTH_INTERVAL", "15"))
+    )
+
+
+_env_pool = None
+_env_lock = threading.Lock()
+
+
+def pool_from_env():
+    """Process-wide pool built from the environment on first use (None if not configured)."""
+    global _env_pool
+    with _env_lock:
+        if _env_pool is None:
+            _env_pool = build_pool(endpoints_from_env(), default_key=os.getenv("OPENAI_API_KEY")) or False
+    return _env_pool or None
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Hedged LLM Requests
+- Tracks a sliding window of observed request latencies per request class
+  (model x max_tokens bucket), so short score-only or triage calls do not set
+  the threshold for full metric calls
+- When a call runs past the configured percentile, sends one duplicate
+  (optionally to another endpoint) and uses whichever valid response lands first
+- Extra requests are capped at a fraction of primary calls
+- Reports how much tail latency hedging removed, over a bounded window of recent calls
+
+The blocking OpenAI client cannot abort an in-flight HTTP request, so the losing
+request is cancelled if it has not started yet and otherwise left to finish in the
+background with its result discarded. Its finish time is used to measure the
+latency that hedging saved.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def percentile(values, pct: float):
+    """Nearest-rank percentile (pct in 0..1) of a non-empty sequence."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct * len(ordered)) - 1))
+    return ordered[index]
+
+
+def request_class(request: dict):
+    """(model, max_tokens rounded up to a power of two): requests expected to take similar time."""
+    max_tokens = int(request.get("max_tokens") or 0)
+    return request.get("model"), 1 << max(0, max_tokens - 1).bit_length()
+
+
+def is_valid(resp):
+    try:
+        return bool(resp["choices"][0]["message"]["content"].strip())
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return False
+
+
+class Hedger:
+    def __init__(self, pct=0.95, budget=0.1, min_samples=20, window=200,
+                 alt_api_base=None, alt_api_key=None, max_workers=32, stats_window=10000):
+        self.pct = pct
+        self.budget = budget
+        self.min_samples = min_samples
+        self.alt = {}
+        if alt_api_base:
+            self.alt["api_base"] = alt_api_base
+        if alt_api_key:
+            self.alt["api_key"] = alt_api_key
+        self.window = window
+        self._latencies = {}  # request class -> deque of recent latencies
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.primary_calls = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.effective = deque(maxlen=stats_window)       # latency the caller actually waited
+        self.counterfactual = deque(maxlen=stats_window)  # latency the caller would have waited without hedging
+        self.latency_saved = 0.0  # running total over every call, not just the window
+
+    # ---------- Policy ----------
+    def threshold(self, key=None):
+        """Hedge delay in seconds for a request class, or None while too few of its latencies were observed."""
+        with self._lock:
+            latencies = self._latencies.get(key, ())
+            if len(latencies) < self.min_samples:
+                return None
+            return percentile(latencies, self.pct)
+
+    def _take_budget(self):
+        with self._lock:
+            if self.hedges_sent + 1 > self.budget * max(self.primary_calls, self.min_samples):
+                return False
+            self.hedges_sent += 1
+            return True
+
+    def _timed(self, create, request, key):
+        started = time.perf_counter()
+        resp = create(**request)
+        with self._lock:
+            window = self._latencies.setdefault(key, deque(maxlen=self.window))
+            window.append(time.perf_counter() - started)
+        return resp
+
+    # ---------- Call ----------
+    def call(self, create, request: dict, hedge_class=None, direct=None):
+        """Run `create(**request)`, hedging once if it is slower than the threshold of its class.
+
+        `hedge_class` defaults to request_class(request). `direct` is the create function without
+        endpoint selection: when an alternate endpoint is configured the hedge goes through it, since
+        a pooled `create` would overwrite api_base/api_key.
+        """
+        key = hedge_class if hedge_class is not None else request_class(request)
+        started = time.perf_counter()
+        with self._lock:
+            self.primary_calls += 1
+        primary = self._pool.submit(self._timed, create, request, key)
+
+        delay = self.threshold(key)
+        done, _ = wait([primary], timeout=delay)
+        if primary in done or not self._take_budget():
+            resp = primary.result()
+            self._record(time.perf_counter() - started)
+            return resp
+
+        hedge_create = direct if self.alt and direct is not None else create
+        hedge = self._pool.submit(self._timed, hedge_create, {**request, **self.alt}, key)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    resp = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if not is_valid(resp):
+                    continue
+                elapsed = time.perf_counter() - started
+                for loser in pending:
+                    loser.cancel()
+                if future is hedge:
+                    with self._lock:
+                        self.hedges_won += 1
+                    primary.add_done_callback(lambda f: self._record_unhedged(f, started, elapsed))
+                else:
+                    self._record(elapsed)
+                return resp
+        if error:
+            raise error
+        raise ValueError("Hedged request returned no valid response.")
+
+    def _record_unhedged(self, primary, started, elapsed):
+        """Once the losing primary finishes, record what waiting for it would have cost."""
+        ok = not primary.cancelled() and primary.exception() is None
+        self._record(elapsed, time.perf_counter() - started if ok else elapsed)
+
+    def _record(self, effective, counterfactual=None):
+        counterfactual = counterfactual if counterfactual is not None else effective
+        with self._lock:
+            self.effective.append(effective)
+            self.counterfactual.append(counterfactual)
+            self.latency_saved += counterfactual - effective
+
+    # ---------- Stats ----------
+    def summary(self):
+        with self._lock:
+            effective, counterfactual = list(self.effective), list(self.counterfactual)
+            out = {
+                "primary_calls": self.primary_calls,
+                "hedges_sent": self.hedges_sent,
+                "hedges_won": self.hedges_won,
+                "extra_request_rate": round(self.hedges_sent / self.primary_calls, 4) if self.primary_calls else 0.0,
+                "latency_saved_s": round(self.latency_saved, 3)
+            }
+        for p in (0.5, 0.95, 0.99):
+            key = f"p{int(p * 100)}"
+            out[f"{key}_s"] = round(percentile(effective, p), 3) if effective else None
+            out[f"{key}_unhedged_s"] = round(percentile(counterfactual, p), 3) if counterfactual else None
+        return out
+
+    def report(self):
+        s = self.summary()
+        print(
+            f"[STATS] hedging: hedges={s['hedges_sent']}/{s['primary_calls']} ({s['extra_request_rate']:.1%}) "
+            f"won={s['hedges_won']} p99={s['p99_s']}s (unhedged {s['p99_unhedged_s']}s) "
+            f"p95={s['p95_s']}s (unhedged {s['p95_unhedged_s']}s) saved={s['latency_saved_s']}s"
+        )
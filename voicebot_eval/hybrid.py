@@ -0,0 +1,1697 @@
+# #!/usr/bin/env python3
+# """
+# Hybrid Metric-wise Voicebot Evaluator
+# - Evaluates each metric individually using strict JSON prompts
+# - Reads API credentials from .env
+# - Saves outputs in evaluations/ directory
+# """
+
+# import os
+# import json
+# import re
+# import time
+# from pathlib import Path
+# from dotenv import load_dotenv
+# from tqdm import tqdm
+# import openai
+
+
+# # ---------- Utility ----------
+# def clean_json_string(raw: str):
+#     """Sanitize common LLM formatting issues."""
+#     if not raw:
+#         return raw
+#     raw = raw.replace("“", '"').replace("”", '"').replace("’", "'").replace("‘", "'")
+#     raw = raw.replace("customer\"s", "customer's").replace("agent\"s", "agent's")
+#     raw = re.sub(r'\\+', '', raw)
+#     raw = re.sub(r'([{,]\s*)([A-Za-z0-9_]+)\s*:', r'\1"\2":', raw)
+#     return raw
+
+
+# def extract_json(text: str):
+#     """Extract and fix JSON from LLM output."""
+#     match = re.search(r"\{.*\}", text, flags=re.DOTALL)
+#     if not match:
+#         raise ValueError("No JSON found in LLM output.")
+#     blob = clean_json_string(match.group(0))
+#     try:
+#         return json.loads(blob)
+#     except json.JSONDecodeError as e:
+#         print("[ERROR] JSON parsing failed:", e)
+#         print("[DEBUG] Raw JSON:", blob[:250])
+#         raise
+
+
+# def llm_call(messages, model, temperature=0.2, max_retries=2):
+#     """Call OpenAI-compatible API with retry logic."""
+#     for attempt in range(max_retries + 1):
+#         try:
+#             resp = openai.ChatCompletion.create(
+#                 model=model,
+#                 messages=messages,
+#                 temperature=temperature,
+#                 max_tokens=1000
+#             )
+#             return resp["choices"][0]["message"]["content"].strip()
+#         except Exception as e:
+#             print(f"[WARN] LLM call failed (attempt {attempt+1}): {e}")
+#             time.sleep(1.5 * attempt)
+#     raise RuntimeError("LLM call failed after retries.")
+
+
+# # ---------- Evaluator ----------
+# class HybridEvaluator:
+#     def __init__(self):
+#         load_dotenv()
+
+#         openai.api_key = os.getenv("OPENAI_API_KEY")
+#         openai.api_base = os.getenv("OPENAI_API_BASE")
+#         self.model = os.getenv("OPENAI_MODEL", "gpt-4-turbo")
+
+#         if not openai.api_key or not openai.api_base:
+#             raise RuntimeError("Missing OPENAI_API_KEY or OPENAI_API_BASE in .env")
+
+#         self.TRANSCRIPTS_DIR = Path("transcripts")
+#         self.OUT_DIR = Path("evaluations")
+#         self.OUT_DIR.mkdir(exist_ok=True)
+
+#         # Metric structure
+#         self.METRICS = {
+#             "quality": [
+#                 {"name": "intent_understanding", "max": 10, "desc": "How well the bot understood customer intent"},
+#                 {"name": "response_relevance", "max": 10, "desc": "Relevance of responses"},
+#                 {"name": "context_continuity", "max": 10, "desc": "Context maintenance"}
+#             ],
+#             "business": [
+#                 {"name": "conversion_accuracy", "max": 15, "desc": "Correct business outcome"},
+#                 {"name": "upsell_emi", "max": 5, "desc": "Upsell/EMI offers"},
+#                 {"name": "escalation_accuracy", "max": 10, "desc": "Escalation correctness"}
+#             ],
+#             "experience": [
+#                 {"name": "empathy_tone", "max": 15, "desc": "Empathy and tone"},
+#                 {"name": "interruption_handling", "max": 10, "desc": "Handling interruptions"},
+#                 {"name": "politeness_clarity", "max": 5, "desc": "Politeness and clarity"}
+#             ],
+#             "compliance": [
+#                 {"name": "introduction", "max": 5, "desc": "Proper introduction and recorded line"},
+#                 {"name": "verification", "max": 5, "desc": "Customer/vehicle verification"},
+#                 {"name": "rules_compliance", "max": 5, "desc": "Disclaimers and escalation rules"},
+#                 {"name": "closing", "max": 5, "desc": "Courteous closing"}
+#             ]
+#         }
+
+#         self.WEIGHTS = {
+#             "quality": 0.35,
+#             "business": 0.30,
+#             "experience": 0.25,
+#             "compliance": 0.10
+#         }
+
+#     def metric_prompt(self, section: str, metric: dict, transcript: str):
+#         """Strict JSON-only prompt for one metric."""
+#         example = {
+#             metric["name"]: metric["max"] // 2,
+#             "comments": "Example: moderate performance."
+#         }
+#         example_str = json.dumps(example, indent=2)
+#         return (
+#             f"You are an expert evaluator for a Maruti Suzuki voicebot.\n"
+#             f"Evaluate ONLY the metric '{metric['name']}' from the '{section}' category.\n"
+#             f"Description: {metric['desc']}\n"
+#             f"Score scale: 0 (worst) to {metric['max']} (best).\n\n"
+#             "Output only valid JSON with these 2 keys:\n"
+#             f"- {metric['name']} (numeric)\n- comments (string)\n\n"
+#             f"Example:\n{example_str}\n\n"
+#             f"Transcript:\n{transcript}"
+#         )
+
+#     def evaluate_metric(self, section: str, metric: dict, transcript: str):
+#         """Call LLM for one metric."""
+#         messages = [
+#             {"role": "system", "content": f"Evaluate the voicebot's {section} performance."},
+#             {"role": "user", "content": self.metric_prompt(section, metric, transcript)}
+#         ]
+#         print(messages)
+#         raw = llm_call(messages, model=self.model)
+#         raw = clean_json_string(raw)
+#         data = extract_json(raw)
+
+#         score = float(data.get(metric["name"], 0))
+#         comments = data.get("comments", "")
+#         return {metric["name"]: score, "comments": comments}
+
+#     def evaluate_transcript(self, file_path: Path):
+#         """Evaluate full transcript section by section."""
+#         print(f"[INFO] Evaluating transcript: {file_path.name}")
+#         text = file_path.read_text(encoding="utf-8")
+#         section_results = {}
+
+#         for section, metrics in self.METRICS.items():
+#             section_data = {}
+#             for metric in metrics:
+#                 try:
+#                     res = self.evaluate_metric(section, metric, text)
+#                     section_data.update(res)
+#                 except Exception as e:
+#                     print(f"[ERROR] {section}:{metric['name']} -> {e}")
+#                     section_data[metric["name"]] = 0
+#                     section_data["comments"] = str(e)
+#             section_results[section] = section_data
+
+#         aggregated = self.aggregate(section_results)
+#         out = {
+#             "transcript_filename": file_path.name,
+#             "timestamp": int(time.time()),
+#             "raw_evaluations": section_results,
+#             "aggregated": aggregated
+#         }
+
+#         out_path = self.OUT_DIR / f"{file_path.stem}.eval.json"
+#         out_path.write_text(json.dumps(out, indent=2), encoding="utf-8")
+#         print(f"[SUCCESS] Saved: {out_path}")
+#         return out
+
+#     def aggregate(self, results: dict):
+#         """Compute weighted final score."""
+#         per_section = {}
+#         final = 0
+#         for section, metrics in self.METRICS.items():
+#             total = sum(results[section].get(m["name"], 0) for m in metrics)
+#             max_total = sum(m["max"] for m in metrics)
+#             pct = (total / max_total) * 100 if max_total else 0
+#             weighted = pct * self.WEIGHTS[section]
+#             per_section[section] = round(pct, 2)
+#             final += weighted
+#         return {"per_section_pct": per_section, "final_score": round(final, 2)}
+
+#     def run(self):
+#         """Run evaluator for all transcripts."""
+#         files = list(self.TRANSCRIPTS_DIR.glob("*.txt"))
+#         if not files:
+#             print("No transcripts found in transcripts/ folder.")
+#             return
+
+#         print(f"Evaluating {len(files)} transcript(s)...\n")
+#         for f in tqdm(files):
+#             self.evaluate_transcript(f)
+
+#         print("\n✅ Done. All results saved in 'evaluations/' folder.")
+
+
+# # ---------- Entry ----------
+# if __name__ == "__main__":
+#     HybridEvaluator().run()
+
+
+
+
+
+
+#!/usr/bin/env python3
+"""
+Hybrid Metric-wise Voicebot Evaluator (Production Version)
+- Evaluates each metric individually using strict JSON prompts
+- Reads API credentials from .env
+- Includes 'proof' and 'max' fields in JSON
+- Computes section totals and weighted overall score
+- Saves structured outputs in evaluations/ directory
+"""
+
+import os
+import sys
+import json
+import re
+import time
+import argparse
+import copy
+import hashlib
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .structured_output import (
+    MODES, ParseStats, explain_schema, metric_schema, parse_structured, request_params, score_schema
+)
+from .routing import ModelStats, escalation_reason
+from .hedging import Hedger
+from .endpoint_pool import build_pool
+from .normalize import count_tokens, normalize_transcript, parse_steps
+from .packing import PackStats, build_packs, demux, member_id, packed_schema, packed_transcripts, split
+from .triage import TRIAGE_METRICS, model_prompt, parse_label, triage
+from .sampling import SampleStats, mean_variance, needs_more, parse_thresholds
+from . import profiling
+from .profiling import span, traced
+from .sharding import build_index, build_summary, merge_shards, parse_shard, select_shard
+from .work_queue import SQLiteWorkQueue
+from .rollups import GRANULARITIES, RollupStore
+from .config import Config
+
+
+# ---------- Utility ----------
+def clean_json_string(raw: str):
+    """Sanitize common LLM formatting issues."""
+    if not raw:
+        return raw
+    raw = raw.replace("“", '"').replace("”", '"').replace("’", "'").replace("‘", "'")
+    raw = raw.replace("customer\"s", "customer's").replace("agent\"s", "agent's")
+    raw = re.sub(r'\\+', '', raw)
+    raw = re.sub(r'([{,]\s*)([A-Za-z0-9_]+)\s*:', r'\1"\2":', raw)
+    return raw
+
+
+def extract_json(text: str):
+    """Extract and fix JSON from LLM output."""
+    match = re.search(r"\{.*\}", text, flags=re.DOTALL)
+    if not match:
+        raise ValueError("No JSON found in LLM output.")
+    blob = clean_json_string(match.group(0))
+    try:
+        return json.loads(blob)
+    except json.JSONDecodeError as e:
+        print("[ERROR] JSON parsing failed:", e)
+        print("[DEBUG] Raw JSON:", blob[:250])
+        raise
+
+
+def llm_call(messages, model, temperature=0.2, max_retries=2, stats=None, hedger=None, pool=None, **params):
+    """Call OpenAI-compatible API with retry logic. Extra params (e.g. response_format) are passed through.
+
+    If `stats` (a routing.ModelStats) is given, latency and token usage of the successful call are recorded.
+    If `hedger` (a hedging.Hedger) is given, slow calls are duplicated and the first valid response wins.
+    If `pool` (an endpoint_pool.EndpointPool) is given, each request goes to the best available endpoint.
+    """
+    import openai  # deferred: keeps importing this module cheap
+
+    create = pool.wrap(openai.ChatCompletion.create) if pool is not None else openai.ChatCompletion.create
+
+    for attempt in range(max_retries + 1):
+        try:
+            started = time.perf_counter()
+            request = {"max_tokens": 1000, **params}
+            request.update(model=model, messages=messages, temperature=temperature)
+            with span("llm_call", cat="llm", model=model, attempt=attempt):
+                if hedger is not None:
+                    resp = hedger.call(create, request, direct=openai.ChatCompletion.create)
+                else:
+                    resp = create(**request)
+            if stats is not None:
+                stats.record(model, time.perf_counter() - started, resp.get("usage"))
+            return resp["choices"][0]["message"]["content"].strip()
+        except Exception as e:
+            print(f"[WARN] LLM call failed (attempt {attempt+1}): {e}")
+            time.sleep(1.5 * attempt)
+    raise RuntimeError("LLM call failed after retries.")
+
+
+def write_json_atomic(path: Path, obj):
+    """Write JSON via a temp file + rename so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with span("write", file=path.name), os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def error_result(metric: dict, e: Exception):
+    """Placeholder metric entry recorded when evaluation fails."""
+    return {
+        "name": metric["name"],
+        "score": 0,
+        "max": metric["max"],
+        "comments": f"Error: {str(e)}",
+        "proof": "",
+        "error": True
+    }
+
+
+def not_applicable_result(metric: dict, label: str):
+    """Entry for a metric skipped by triage; excluded from section totals."""
+    return {
+        "name": metric["name"],
+        "score": 0,
+        "max": metric["max"],
+        "comments": f"Not applicable (triage: {label})",
+        "proof": "",
+        "applicable": False
+    }
+
+
+def fingerprint(payload: dict):
+    """Short stable hash of a JSON-serialisable definition."""
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def is_failed(entry: dict):
+    """True for metric entries produced by error_result (including older records without the flag)."""
+    return bool(entry.get("error")) or str(entry.get("comments", "")).startswith("Error:")
+
+
+def section_summary(metrics_data: list):
+    """Section block with totals recomputed from its metric entries.
+
+    Metrics marked applicable=False (triage) don't count; a section with none left has percentage None.
+    """
+    counted = [m for m in metrics_data if m.get("applicable", True)]
+    total_score = sum(m["score"] for m in counted)
+    max_score = sum(m["max"] for m in counted)
+    if counted:
+        pct = round((total_score / max_score) * 100, 2) if max_score else 0
+    else:
+        pct = None
+    return {
+        "metrics": metrics_data,
+        "total_score": round(total_score, 2),
+        "max_score": max_score,
+        "percentage": pct
+    }
+
+
+# ---------- Evaluator ----------
+class HybridEvaluator:
+    def __init__(self, config: Config = None):
+        # Construction is cheap: no network, no directory creation. The OpenAI
+        # client is configured on the first LLM call (see ensure_client).
+        self.config = config or Config.from_env()
+        self.model = self.config.model
+        self._client_ready = False
+
+        # Structured output: "off" (prompt + regex repair), "openai" (response_format) or "vllm" (guided_json)
+        self.structured_mode = self.config.structured_output
+        if self.structured_mode not in MODES:
+            raise RuntimeError(f"STRUCTURED_OUTPUT must be one of {', '.join(MODES)}")
+        self.parse_retries = self.config.parse_retries
+        self.parse_stats = ParseStats()
+
+        self.workers = self.config.workers
+
+        # Model routing: metrics routed "fast" use OPENAI_FAST_MODEL (when set) and
+        # escalate to self.model on malformed, out-of-range or disagreeing samples.
+        self.MODEL_TIERS = {"strong": self.model, "fast": self.config.fast_model}
+        self.fast_samples = self.config.fast_samples
+        self.fast_tolerance = self.config.fast_tolerance
+        self.model_stats = ModelStats()
+
+        # Hedging: duplicate calls slower than the recent latency percentile (opt-in)
+        self.hedger = None
+        if self.config.hedge:
+            self.hedger = Hedger(
+                pct=self.config.hedge_percentile,
+                budget=self.config.hedge_budget,
+                alt_api_base=self.config.hedge_api_base,
+                alt_api_key=self.config.hedge_api_key
+            )
+
+        # Endpoint pool: several OpenAI-compatible replicas instead of one OPENAI_API_BASE
+        self.pool = build_pool(self.config.endpoints, self.config.pool_strategy, default_key=self.config.api_key)
+
+        # Normalization pre-pass run once per transcript before prompting (NORMALIZE=default or a step list)
+        self.normalize_steps = parse_steps(self.config.normalize)
+
+        # Triage: "rules" labels trivial calls locally, "model" also asks the fast model about short calls
+        self.triage_mode = self.config.triage
+        if self.triage_mode not in ("off", "rules", "model"):
+            raise RuntimeError("TRIAGE must be one of off, rules, model")
+        self.triage_counts = {}
+        self._triage_lock = threading.Lock()
+
+        # Score-only mode: metric calls return just the number; comments/proof are generated later
+        # (eagerly for scores below EXPLAIN_BELOW x max, otherwise via `eval.py explain`)
+        self.score_only = self.config.score_only
+        self.explain_below = self.config.explain_below
+
+        # Adaptive sampling: extra samples only while samples disagree or sit near a decision threshold
+        self.adaptive = self.config.adaptive
+        self.max_samples = self.config.max_samples
+        self.sample_tolerance = self.config.sample_tolerance
+        self.decision_thresholds = parse_thresholds(self.config.decision_thresholds)
+        self.threshold_margin = self.config.threshold_margin
+        self.sample_stats = SampleStats()
+
+        # Packing: short transcripts (<= PACK_TOKENS together) share one request per metric
+        self.pack_tokens = self.config.pack_tokens
+        self.pack_max = self.config.pack_max
+        self.pack_stats = PackStats()
+
+        # Rollups: hourly/daily trend aggregates in <OUT_DIR>/rollups.db, updated as each record is written
+        self._rollups = None
+
+        self.TRANSCRIPTS_DIR = Path(self.config.transcripts_dir)
+        self.OUT_DIR = Path(self.config.out_dir)
+
+        self.METRICS = {
+            "quality": [
+                {"name": "intent_understanding", "max": 10, "desc": "How well the bot understood customer intent"},
+                {"name": "response_relevance", "max": 10, "desc": "Relevance of responses"},
+                {"name": "context_continuity", "max": 10, "desc": "Context maintenance"}
+            ],
+            "business": [
+                {"name": "conversion_accuracy", "max": 15, "desc": "Correct business outcome"},
+                {"name": "upsell_emi", "max": 5, "desc": "Upsell/EMI offers", "route": "fast"},
+                {"name": "escalation_accuracy", "max": 10, "desc": "Escalation correctness"}
+            ],
+            "experience": [
+                {"name": "empathy_tone", "max": 15, "desc": "Empathy and tone"},
+                {"name": "interruption_handling", "max": 10, "desc": "Handling interruptions"},
+                {"name": "politeness_clarity", "max": 5, "desc": "Politeness and clarity", "route": "fast"}
+            ],
+            "compliance": [
+                {"name": "introduction", "max": 5, "desc": "Proper introduction and recorded line", "settle": "opening"},
+                {"name": "verification", "max": 5, "desc": "Customer/vehicle verification", "settle": "opening"},
+                {"name": "rules_compliance", "max": 5, "desc": "Disclaimers and escalation rules", "route": "strong"},
+                {"name": "closing", "max": 5, "desc": "Courteous closing", "context": "tail"}
+            ]
+        }
+
+        # Live sessions (voicebot_eval.LiveSession): metrics with "settle": "opening" are scored
+        # once the opening turns arrive; the rest run at hang-up, with "context": "tail" ones
+        # seeing only the last turns of the call.
+
+        # Metrics still evaluated for calls triaged as trivial; all others are marked not applicable
+        self.TRIAGE_METRICS = copy.deepcopy(TRIAGE_METRICS)
+
+        # Default route per section; a metric's own "route" key takes precedence
+        self.SECTION_ROUTES = {
+            "compliance": "fast"
+        }
+
+        self.WEIGHTS = {
+            "quality": 0.35,
+            "business": 0.30,
+            "experience": 0.25,
+            "compliance": 0.10
+        }
+
+    def ensure_client(self):
+        """Configure the OpenAI client once, on first use."""
+        if self._client_ready:
+            return
+        if self.pool is None and (not self.config.api_key or not self.config.api_base):
+            raise RuntimeError("Missing OPENAI_API_KEY or OPENAI_API_BASE in .env")
+        import openai
+        openai.api_key = self.config.api_key or self.pool.endpoints[0].api_key
+        openai.api_base = self.config.api_base or self.pool.endpoints[0].api_base
+        self._client_ready = True
+
+    # ---------- Prompt ----------
+    # def metric_prompt(self, section: str, metric: dict, transcript: str):
+    #     """Strict JSON-only prompt for one metric."""
+    #     return (
+    #         f"You are an expert evaluator for a Maruti Suzuki voicebot.\n"
+    #         f"Evaluate ONLY the metric '{metric['name']}' from the '{section}' category.\n"
+    #         f"Description: {metric['desc']}\n"
+    #         f"Score scale: 0 (worst) to {metric['max']} (best).\n\n"
+    #         "Return ONLY valid JSON with the following keys:\n"
+    #         f"- {metric['name']}: numeric score between 0 and {metric['max']}\n"
+    #         "- comments: short reasoning (1-2 lines)\n"
+    #         "- proof: exact line(s) or phrases from transcript that support the score\n\n"
+    #         "Do NOT include examples, explanations, or text outside JSON.\n\n"
+    #         f"Transcript:\n{transcript}"
+    #     )
+    def metric_prompt(self, section: str, metric: dict, transcript: str):
+        """Production-grade JSON-only prompt for one Voicebot evaluation metric."""
+        return f"""
+    ROLE:
+    You are an expert conversation quality evaluator for the Maruti Suzuki Voicebot.
+
+    TASK:
+    Evaluate the transcript provided below for the specific metric '{metric['name']}' under the '{section}' category.
+
+    METRIC DETAILS:
+    - Description: {metric['desc']}
+    - Scoring Scale: 0 (worst) to {metric['max']} (best)
+
+    EVALUATION FOCUS:
+    - Assess only this single metric; ignore all others.
+    - Base your judgment strictly on the agent’s and customer’s spoken interactions as shown in the transcript.
+    - Remain objective — no assumptions or inferred meanings.
+
+    SCORING REQUIREMENTS:
+    - Assign one numeric score between 0 and {metric['max']}
+    - Provide a brief reasoning (1–2 lines)
+    - Extract verbatim supporting phrase(s) from the transcript
+
+    OUTPUT FORMAT:
+    ```json
+    {{
+    "{metric['name']}": <numeric_score_between_0_and_{metric['max']}>,
+    "comments": "<short_reasoning>",
+    "proof": "<exact_line_or_phrase_from_transcript>"
+    }}
+    CRITICAL INSTRUCTIONS:
+
+    Respond ONLY with the JSON object shown above — no explanations, notes, or markdown.
+
+    Ensure valid JSON (double quotes only, no trailing commas).
+
+    The "proof" field must contain exact verbatim text from the transcript.
+
+    If the transcript lacks evidence for this metric, return an empty string for "proof".
+
+    TRANSCRIPT:
+    {transcript}
+"""
+    def score_prompt(self, section: str, metric: dict, transcript: str):
+        """Score-only prompt: the reply is a single number, no reasoning or proof."""
+        return (
+            "You are an expert conversation quality evaluator for the Maruti Suzuki Voicebot.\n"
+            f"Score the transcript below for the metric '{metric['name']}' ({section}): {metric['desc']}.\n"
+            f"Scale: 0 (worst) to {metric['max']} (best). Judge only this metric, strictly from the transcript.\n"
+            f'Respond ONLY with JSON: {{"{metric["name"]}": <score>}}\n\n'
+            f"TRANSCRIPT:\n{transcript}"
+        )
+
+    def explain_prompt(self, section: str, metric: dict, transcript: str, score):
+        """Prompt justifying a score that was already assigned in score-only mode."""
+        return (
+            "You are an expert conversation quality evaluator for the Maruti Suzuki Voicebot.\n"
+            f"The transcript below was scored {score}/{metric['max']} for the metric '{metric['name']}' "
+            f"({section}): {metric['desc']}.\n"
+            "Explain this score. Respond ONLY with JSON:\n"
+            '{"comments": "<short reasoning, 1-2 lines>", "proof": "<exact line(s) from the transcript>"}\n'
+            'The "proof" must be verbatim transcript text, or an empty string if there is no evidence.\n\n'
+            f"TRANSCRIPT:\n{transcript}"
+        )
+
+    def packed_prompt(self, section: str, metric: dict, texts: list):
+        """JSON-only prompt scoring one metric for several delimited transcripts at once."""
+        ids = [member_id(i) for i in range(len(texts))]
+        if self.score_only:
+            return (
+                "You are an expert conversation quality evaluator for the Maruti Suzuki Voicebot.\n"
+                f"Below are {len(texts)} separate call transcripts, each between \"=== CALL <id> ===\" and "
+                "\"=== END <id> ===\".\n"
+                f"Score EACH call independently for the metric '{metric['name']}' ({section}): {metric['desc']}.\n"
+                f"Scale: 0 (worst) to {metric['max']} (best). Judge only this metric, strictly from that call's "
+                "transcript.\n"
+                f'Respond ONLY with JSON, one entry per call ID ({", ".join(ids)}): '
+                f'{{"{ids[0]}": {{"{metric["name"]}": <score>}}, ...}}\n\n'
+                f"TRANSCRIPTS:\n{packed_transcripts(texts)}"
+            )
+        return f"""
+    ROLE:
+    You are an expert conversation quality evaluator for the Maruti Suzuki Voicebot.
+
+    TASK:
+    Below are {len(texts)} separate call transcripts, each between "=== CALL <id> ===" and "=== END <id> ===".
+    Evaluate EACH call independently for the specific metric '{metric['name']}' under the '{section}' category.
+
+    METRIC DETAILS:
+    - Description: {metric['desc']}
+    - Scoring Scale: 0 (worst) to {metric['max']} (best)
+
+    EVALUATION FOCUS:
+    - Assess only this single metric; ignore all others.
+    - Judge every call only on its own transcript; never carry evidence across calls.
+    - Remain objective — no assumptions or inferred meanings.
+
+    OUTPUT FORMAT:
+    One JSON object with exactly one entry per call ID ({", ".join(ids)}):
+    ```json
+    {{
+    "{ids[0]}": {{"{metric['name']}": <numeric_score_between_0_and_{metric['max']}>, "comments": "<short_reasoning>", "proof": "<exact_line_or_phrase_from_that_call>"}},
+    ...
+    }}
+    CRITICAL INSTRUCTIONS:
+
+    Respond ONLY with the JSON object — no explanations, notes, or markdown.
+
+    Ensure valid JSON (double quotes only, no trailing commas).
+
+    Each "proof" must be exact verbatim text from that call's transcript, or an empty string.
+
+    TRANSCRIPTS:
+    {packed_transcripts(texts)}
+"""
+
+    # ---------- Metric Evaluation ----------
+    def evaluate_metric(self, section: str, metric: dict, transcript: str):
+        """Call LLM for one metric."""
+        with span("metric", section=section, metric=metric["name"]):
+            return self._evaluate_metric(section, metric, transcript)
+
+    def metric_messages(self, section: str, metric: dict, transcript: str):
+        """(messages, call_and_parse extras) for one metric, in score-only or full mode."""
+        with span("prompt_build"):
+            if self.score_only:
+                prompt = self.score_prompt(section, metric, transcript)
+                extra = {"schema": score_schema(metric), "max_tokens": 16}
+            else:
+                prompt = self.metric_prompt(section, metric, transcript)
+                extra = {}
+            messages = [
+                {"role": "system", "content": f"Evaluate the voicebot's {section} performance objectively."},
+                {"role": "user", "content": prompt}
+            ]
+        return messages, extra
+
+    def _evaluate_metric(self, section: str, metric: dict, transcript: str):
+        messages, extra = self.metric_messages(section, metric, transcript)
+        route = metric.get("route", self.SECTION_ROUTES.get(section, "strong"))
+        fast_model = self.MODEL_TIERS.get(route) if route != "strong" else None
+        if fast_model:
+            result = self.evaluate_cheap(messages, metric, fast_model, **extra)
+            if result is not None:
+                return result
+
+        if self.adaptive:
+            result = self.combine_samples(self.draw_samples(messages, metric, self.model, **extra))
+        else:
+            result = self.metric_result(metric, self.call_and_parse(messages, metric, self.model, **extra))
+        result["model"] = self.model
+        if fast_model:
+            result["escalated"] = True
+        return result
+
+    def metric_result(self, metric: dict, data: dict):
+        """Normalise a parsed LLM response into a metric entry.
+
+        A score-only response gets "explained": False until explain_entry fills in comments and proof.
+        """
+        entry = {
+            "name": metric["name"],
+            "score": float(data.get(metric["name"], 0)),
+            "max": metric["max"],
+            "comments": data.get("comments", ""),
+            "proof": data.get("proof", "")
+        }
+        if "comments" not in data and "proof" not in data:
+            entry["explained"] = False
+        return entry
+
+    def evaluate_cheap(self, messages, metric: dict, model: str, **extra):
+        """Score with the cheap model; return None when the answer must be escalated."""
+        samples = []
+        try:
+            if self.adaptive:
+                samples = self.draw_samples(messages, metric, model, **extra)
+            else:
+                for _ in range(max(1, self.fast_samples)):
+                    samples.append(self.metric_result(metric, self.call_and_parse(messages, metric, model, **extra)))
+        except Exception as e:
+            print(f"[WARN] {metric['name']}: cheap model {model} failed ({e})")
+            samples.append(None)
+
+        reason = escalation_reason(metric, [s and s["score"] for s in samples], self.fast_tolerance)
+        if reason:
+            print(f"[INFO] {metric['name']}: escalating from {model} ({reason})")
+            self.model_stats.record_escalation(reason)
+            return None
+
+        result = self.combine_samples(samples) if self.adaptive else samples[0]
+        result["score"] = round(sum(s["score"] for s in samples) / len(samples), 2)
+        result["model"] = model
+        return result
+
+    def draw_samples(self, messages, metric: dict, model: str, initial=(), **extra):
+        """Sample until needs_more() is satisfied: stable, clear of decision thresholds, or at MAX_SAMPLES.
+
+        `initial` holds samples already drawn elsewhere (e.g. a packed result) that count towards the cap.
+        """
+        samples, reasons = list(initial), []
+        while True:
+            if samples:
+                reason = needs_more([s["score"] for s in samples], metric["max"], self.sample_tolerance,
+                                    self.decision_thresholds, self.threshold_margin, self.max_samples)
+                if reason is None:
+                    break
+                reasons.append(reason)
+            samples.append(self.metric_result(metric, self.call_and_parse(messages, metric, model, **extra)))
+        scores = [s["score"] for s in samples]
+        capped = len(samples) >= self.max_samples and max(scores) - min(scores) > self.sample_tolerance * metric["max"]
+        self.sample_stats.record(len(samples), capped=capped, reasons=reasons)
+        return samples
+
+    @staticmethod
+    def combine_samples(samples: list):
+        """Mean score with variance; comments/proof come from the sample closest to the mean."""
+        scores = [s["score"] for s in samples]
+        mean, variance = mean_variance(scores)
+        result = dict(min(samples, key=lambda s: abs(s["score"] - mean)))
+        result.update(score=round(mean, 2), samples=len(samples), variance=round(variance, 4))
+        if len(samples) > 1:
+            result["sample_scores"] = scores
+        return result
+
+    def call_and_parse(self, messages, metric: dict, model: str, schema: dict = None, **extra):
+        """Call the LLM and parse its JSON, re-calling on parse failure.
+
+        With structured output active the schema is enforced server-side, so the
+        response is parsed directly and the heuristic repair path is skipped.
+        `schema` overrides the single-metric schema; `extra` is passed to llm_call.
+        """
+        self.ensure_client()
+        structured = self.structured_mode != "off"
+        params = request_params(self.structured_mode, metric["name"], schema or metric_schema(metric))
+        params.update(extra)
+        for attempt in range(self.parse_retries + 1):
+            self.parse_stats.record_call(recall=attempt > 0)
+            raw = llm_call(messages, model=model, stats=self.model_stats, hedger=self.hedger, pool=self.pool, **params)
+            try:
+                with span("parse", structured=structured):
+                    if structured:
+                        return parse_structured(raw)
+                    return extract_json(clean_json_string(raw))
+            except ValueError as e:  # json.JSONDecodeError is a ValueError
+                self.parse_stats.record_failure()
+                if attempt == self.parse_retries:
+                    raise
+                print(f"[WARN] {metric['name']}: unparseable response, re-calling ({e})")
+
+    # ---------- Section Evaluation ----------
+    def evaluate_transcript(self, file_path: Path, prepared=None):
+        """Evaluate full transcript section by section."""
+        print(f"[INFO] Evaluating transcript: {file_path.name}")
+        with span("transcript", transcript=file_path.name):
+            with span("read"):
+                text = file_path.read_text(encoding="utf-8")
+            return self.write_record(self.evaluate_text(text, file_path.name, prepared))
+
+    def evaluate_text(self, text: str, transcript_filename: str, prepared=None):
+        """Evaluate transcript text and return its eval record (nothing is written).
+
+        Sections run concurrently when more than one worker is configured. `prepared` is a
+        (prompt_text, norm) pair from prepare_text() when the caller already normalized the text.
+        """
+        prompt_text, norm = prepared or self.prepare_text(text)
+        tri = self.triage_transcript(text)
+        workers = max(1, min(self.workers, len(self.METRICS)))
+        # this thread only blocks on the section futures; keep that out of the transcript's self time
+        with span("section_wait", cat="wait"), ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                section: pool.submit(traced(self.evaluate_section, "section", section=section),
+                                     section, prompt_text, tri and tri["label"])
+                for section in self.METRICS
+            }
+            section_results = {section: f.result() for section, f in futures.items()}
+        return self.finish_record(transcript_filename, section_results, tri, norm)
+
+    def finish_record(self, transcript_filename: str, section_results: dict, tri=None, norm=None):
+        """Restore proofs and build the record, with triage and normalization details attached."""
+        for details in section_results.values():
+            self.restore_proofs(details["metrics"], norm)
+
+        return self.attach_metadata(self.build_record(transcript_filename, section_results),
+                                    tri, norm and norm.stats())
+
+    @staticmethod
+    def attach_metadata(record: dict, tri=None, norm_stats=None):
+        """Attach triage and normalization details to a record."""
+        if tri is not None:
+            record["triage"] = tri
+        if norm_stats is not None:
+            record["normalization"] = s = norm_stats
+            print(f"[INFO] {record['transcript_filename']}: {s['tokens_before']} -> {s['tokens_after']} tokens "
+                  f"({s['saved_pct']}% saved, {s['tokenizer']} tokenizer)")
+        return record
+
+    def prepare_text(self, text: str):
+        """Normalize a transcript once before prompting. Returns (prompt_text, NormalizedTranscript or None)."""
+        if not self.normalize_steps:
+            return text, None
+        with span("normalize"):
+            norm = normalize_transcript(text, self.normalize_steps)
+        return norm.text, norm
+
+    def triage_transcript(self, text: str, count=True):
+        """Triage result for a transcript, or None when triage is off.
+
+        With count=False the result is left out of the run's triage stats (see count_triage).
+        """
+        if self.triage_mode == "off":
+            return None
+        with span("triage"):
+            result = triage(text)
+        if self.triage_mode == "model" and result["short"]:
+            model = self.MODEL_TIERS.get("fast") or self.model
+            try:
+                self.ensure_client()
+                raw = llm_call([{"role": "user", "content": model_prompt(text)}], model=model,
+                               stats=self.model_stats, pool=self.pool, max_tokens=5)
+                label = parse_label(raw)
+                if label:
+                    result.update(label=label, reason=f"model {model}")
+            except Exception as e:
+                print(f"[WARN] Triage model call failed, keeping rule label ({e})")
+
+        skipped = 0
+        if result["label"] != "full":
+            applicable = set(self.TRIAGE_METRICS.get(result["label"], []))
+            skipped = sum(1 for metrics in self.METRICS.values() for m in metrics if m["name"] not in applicable)
+        result["skipped_metrics"] = skipped
+        if count:
+            self.count_triage(result)
+        return result
+
+    def count_triage(self, result: dict):
+        with self._triage_lock:
+            counts = self.triage_counts.setdefault(result["label"], {"transcripts": 0, "skipped_metrics": 0})
+            counts["transcripts"] += 1
+            counts["skipped_metrics"] += result["skipped_metrics"]
+
+    @staticmethod
+    def restore_proofs(metrics_data: list, norm):
+        """Point proofs back at the original transcript lines; the quoted text is kept as proof_normalized."""
+        if norm is None:
+            return
+        for m in metrics_data:
+            if m.get("proof"):
+                m["proof_normalized"] = m["proof"]
+                m["proof"] = norm.to_original(m["proof"])
+
+    def evaluate_section(self, section: str, text: str, triage_label: str = None):
+        """Evaluate every metric of one section; failed metrics are kept as error entries.
+
+        For a call triaged as trivial only the metrics in TRIAGE_METRICS[label] are sent to the LLM.
+        """
+        applicable = None
+        if triage_label and triage_label != "full":
+            applicable = set(self.TRIAGE_METRICS.get(triage_label, []))
+        metrics_data = []
+        for metric in self.METRICS[section]:
+            if applicable is not None and metric["name"] not in applicable:
+                metrics_data.append(not_applicable_result(metric, triage_label))
+                continue
+            try:
+                res = self.evaluate_metric(section, metric, text)
+                if res.get("explained") is False and res["score"] < self.explain_below * metric["max"]:
+                    self.explain_entry(section, metric, text, res)
+                metrics_data.append(res)
+            except Exception as e:
+                print(f"[ERROR] {section}:{metric['name']} -> {e}")
+                metrics_data.append(error_result(metric, e))
+        return section_summary(metrics_data)
+
+    def build_record(self, transcript_filename: str, section_results: dict):
+        """Assemble an eval record from section results, stamping each metric with its fingerprint."""
+        for section, details in section_results.items():
+            self.stamp_fingerprints(section, details["metrics"])
+        return {
+            "transcript_filename": transcript_filename,
+            "timestamp": int(time.time()),
+            "sections": section_results,
+            "aggregated": self.aggregate(section_results),
+            "weights": dict(self.WEIGHTS),
+            **({"bot_version": self.config.bot_version} if self.config.bot_version else {})
+        }
+
+    # ---------- Rollups ----------
+    def rollup_store(self, out_dir: Path = None):
+        """RollupStore in <out_dir>/rollups.db (created on first use)."""
+        if out_dir is not None:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            return RollupStore(out_dir / "rollups.db")
+        if self._rollups is None:
+            self.OUT_DIR.mkdir(parents=True, exist_ok=True)
+            self._rollups = RollupStore(self.OUT_DIR / "rollups.db")
+        return self._rollups
+
+    def update_rollups(self, record: dict, previous: dict = None):
+        """Fold a record into the rollups before it is written, replacing `previous` when it was re-evaluated.
+
+        Runs before the write so the "rolled_up" stamp is persisted with the record.
+        """
+        if not self.config.rollups:
+            return
+        try:
+            if previous is None:
+                self.rollup_store().add(record)
+            else:
+                self.rollup_store().replace(previous, record)
+        except Exception as e:  # trend data must never cost an evaluation
+            print(f"[WARN] Rollup update failed for {record.get('transcript_filename')}: {e}")
+
+    def write_rollup_feeds(self, store: RollupStore = None, out_dir: Path = None, since: str = None):
+        """Write <out_dir>/rollups/<granularity>.json trend feeds for the dashboard."""
+        store = store or self.rollup_store()
+        feed_dir = (out_dir or self.OUT_DIR) / "rollups"
+        feed_dir.mkdir(parents=True, exist_ok=True)
+        for granularity in GRANULARITIES:
+            write_json_atomic(feed_dir / f"{granularity}.json", store.feed(granularity, since))
+        print(f"[INFO] Rollup feeds written to {feed_dir}/")
+
+    def rebuild_rollups(self):
+        """Recreate rollups.db from every eval file in OUT_DIR (backfill or after manual edits)."""
+        db = self.OUT_DIR / "rollups.db"
+        for path in (db, Path(f"{db}-wal"), Path(f"{db}-shm")):
+            if path.exists():
+                path.unlink()
+        self._rollups = None
+        store = self.rollup_store()
+        paths = sorted(self.OUT_DIR.glob("*.eval.json"))
+        for path in paths:
+            record = json.loads(path.read_text(encoding="utf-8"))
+            stamped = record.get("rolled_up")
+            store.add(record)
+            if not stamped:
+                write_json_atomic(path, record)
+        print(f"[INFO] Rebuilt rollups from {len(paths)} eval file(s)")
+        return store
+
+    # ---------- Fingerprints ----------
+    def metric_fingerprint(self, section: str, metric: dict, packed=False):
+        """Hash of everything that determines a metric's score: prompt template, max and model(s).
+
+        Entries scored in a pack are fingerprinted with the packed prompt template.
+        """
+        route = metric.get("route", self.SECTION_ROUTES.get(section, "strong"))
+        fast_model = self.MODEL_TIERS.get(route) if route != "strong" else None
+        if packed:
+            prompt = self.packed_prompt(section, metric, ["", ""])
+        else:
+            prompt = (self.score_prompt if self.score_only else self.metric_prompt)(section, metric, "")
+        return fingerprint({
+            "section": section,
+            "name": metric["name"],
+            "max": metric["max"],
+            "prompt": prompt,
+            "models": [m for m in (fast_model, self.model) if m]
+        })
+
+    def stamp_fingerprints(self, section: str, metrics_data: list):
+        """Record the current definition fingerprint on freshly evaluated entries (not on errors)."""
+        defs = {m["name"]: m for m in self.METRICS.get(section, [])}
+        for entry in metrics_data:
+            if entry["name"] in defs and not is_failed(entry):
+                packed = entry.get("packed", False)
+                entry["fingerprint"] = self.metric_fingerprint(section, defs[entry["name"]], packed)
+
+    def write_record(self, record: dict):
+        """Write evaluations/<stem>.eval.json."""
+        self.OUT_DIR.mkdir(parents=True, exist_ok=True)
+        out_path = self.OUT_DIR / f"{Path(record['transcript_filename']).stem}.eval.json"
+        previous = None
+        if self.config.rollups and out_path.is_file():
+            # re-running a transcript replaces its earlier contribution instead of adding a second one
+            previous = json.loads(out_path.read_text(encoding="utf-8"))
+        self.update_rollups(record, previous)
+        write_json_atomic(out_path, record)
+        print(f"[SUCCESS] Saved: {out_path}")
+        return record
+
+    def save_record(self, transcript_filename: str, section_results: dict, tri=None, norm_stats=None):
+        """Aggregate section results and write evaluations/<stem>.eval.json."""
+        record = self.build_record(transcript_filename, section_results)
+        return self.write_record(self.attach_metadata(record, tri, norm_stats))
+
+    # ---------- Aggregation ----------
+    def aggregate(self, results: dict):
+        """Compute weighted final score. Sections with no applicable metrics are left out and
+        the remaining weights are rescaled."""
+        final = 0
+        used = 0
+        for section, details in results.items():
+            if details["percentage"] is None:
+                continue
+            weighted = details["percentage"] * self.WEIGHTS[section]
+            final += weighted
+            used += self.WEIGHTS[section]
+        total = sum(self.WEIGHTS[section] for section in results)
+        if used and used < total:
+            final = final * total / used
+        return {"final_weighted_score": round(final, 2)}
+
+    # ---------- Runner ----------
+    def run(self, shard=None, shard_by="name"):
+        """Run evaluator for all transcripts, or only shard (i, n) of them."""
+        files = sorted(self.TRANSCRIPTS_DIR.glob("*.txt"))
+        if shard:
+            index, count = shard
+            files = select_shard(files, index, count, by=shard_by)
+            print(f"[INFO] Shard {index}/{count}: {len(files)} transcript(s)")
+        if not files:
+            print("No transcripts found in transcripts/ folder.")
+            return
+
+        from tqdm import tqdm
+
+        prepared = {}
+        if self.pack_tokens > 0:
+            files, prepared = self.run_packed(files)
+
+        print(f"Evaluating {len(files)} transcript(s)...\n")
+        for f in tqdm(files):
+            self.evaluate_transcript(f, prepared.get(f.name))
+
+        print("\n✅ Done. All results saved in 'evaluations/' folder.")
+        self.report_stats()
+        if self.config.rollups:
+            self.write_rollup_feeds()
+
+    # ---------- Packing ----------
+    def run_packed(self, files):
+        """Evaluate transcripts that fit PACK_TOKENS in packs.
+
+        Returns the files left for normal evaluation and their {name: (prompt_text, norm)},
+        so they are not normalized twice. Only packed members are triaged here.
+        """
+        items = []
+        prepared = {}
+        for f in files:
+            text = f.read_text(encoding="utf-8")
+            prepared[f.name] = self.prepare_text(text)
+            items.append((f, prepared[f.name][0], count_tokens(prepared[f.name][0])[0], text))
+        packs, single = build_packs(items, self.pack_tokens, self.pack_max)
+        packs, lone = [p for p in packs if len(p) > 1], [p[0] for p in packs if len(p) == 1]
+        rest = sorted([item[0] for item in single + lone])
+        if not packs:
+            return rest, prepared
+        triaged = {f.name: self.triage_transcript(text) for pack in packs for f, _, _, text in pack}
+
+        from tqdm import tqdm
+
+        jobs = []  # (section, metric, [(file name, prompt text)])
+        for pack in packs:
+            for section, metrics in self.METRICS.items():
+                for metric in metrics:
+                    members = [(f.name, prepared[f.name][0]) for f, *_ in pack
+                               if self.is_applicable(metric, triaged[f.name])]
+                    if members:
+                        jobs.append((section, metric, members))
+
+        packed = sum(len(p) for p in packs)
+        print(f"Evaluating {packed} short transcript(s) in {len(packs)} pack(s) ({len(jobs)} packed request(s))...\n")
+        results = {}
+        with span("pack_wait", cat="wait"), ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            futures = [
+                pool.submit(traced(self.evaluate_packed, "pack", metric=metric["name"]), section, metric, members)
+                for section, metric, members in jobs
+            ]
+            for (section, metric, _), future in zip(jobs, tqdm(futures)):
+                for name, entry in future.result().items():
+                    results[(name, section, metric["name"])] = entry
+
+        for pack in packs:
+            for f, *_ in pack:
+                prompt_text, norm = prepared[f.name]
+                tri = triaged[f.name]
+                section_results = {}
+                for section, metrics in self.METRICS.items():
+                    metrics_data = []
+                    for m in metrics:
+                        if not self.is_applicable(m, tri):
+                            metrics_data.append(not_applicable_result(m, tri["label"]))
+                            continue
+                        entry = results[(f.name, section, m["name"])]
+                        if entry.get("explained") is False and entry["score"] < self.explain_below * m["max"]:
+                            self.explain_entry(section, m, prompt_text, entry)
+                        metrics_data.append(entry)
+                    section_results[section] = section_summary(metrics_data)
+                self.write_record(self.finish_record(f.name, section_results, tri, norm))
+        return rest, prepared
+
+    def is_applicable(self, metric: dict, tri):
+        """False when triage marked the call trivial and the metric doesn't apply to it."""
+        if tri is None or tri["label"] == "full":
+            return True
+        return metric["name"] in self.TRIAGE_METRICS.get(tri["label"], [])
+
+    def evaluate_packed(self, section: str, metric: dict, members: list):
+        """Score one metric for several (name, text) members in one request.
+
+        Members with a missing or invalid result are split into halves and retried;
+        a lone member falls back to evaluate_metric. Returns {name: metric entry}.
+        """
+        if len(members) == 1:
+            name, text = members[0]
+            try:
+                return {name: self.evaluate_metric(section, metric, text)}
+            except Exception as e:
+                print(f"[ERROR] {name} {section}:{metric['name']} -> {e}")
+                return {name: error_result(metric, e)}
+
+        texts = [text for _, text in members]
+        ids = [member_id(i) for i in range(len(members))]
+        prompt = self.packed_prompt(section, metric, texts)
+        messages = [
+            {"role": "system", "content": f"Evaluate the voicebot's {section} performance objectively."},
+            {"role": "user", "content": prompt}
+        ]
+        route = metric.get("route", self.SECTION_ROUTES.get(section, "strong"))
+        model = (self.MODEL_TIERS.get(route) if route != "strong" else None) or self.model
+        single_prompt = self.score_prompt if self.score_only else self.metric_prompt
+        self.pack_stats.record_request(prompt, texts, count_tokens(single_prompt(section, metric, ""))[0])
+        schema = score_schema(metric) if self.score_only else metric_schema(metric)
+        try:
+            data = self.call_and_parse(messages, metric, model, schema=packed_schema(ids, schema),
+                                       max_tokens=(24 if self.score_only else 300) * len(members))
+        except Exception as e:
+            print(f"[WARN] {section}:{metric['name']} pack of {len(members)} failed ({e})")
+            data = None
+
+        results, retry = {}, []
+        for (name, text), (mid, entry) in zip(members, demux(data, ids).items()):
+            score = entry.get(metric["name"]) if entry is not None else None
+            if isinstance(score, (int, float)) and escalation_reason(metric, [score], self.fast_tolerance) is None:
+                result = self.metric_result(metric, entry)
+                if self.adaptive:
+                    # the packed score is the first sample; top up with single calls only if it is unsettled
+                    single_messages, extra = self.metric_messages(section, metric, text)
+                    result = self.combine_samples(
+                        self.draw_samples(single_messages, metric, model, initial=[result], **extra)
+                    )
+                result.update(model=model, packed=True)
+                results[name] = result
+            else:
+                retry.append((name, text))
+        if retry:
+            print(f"[INFO] {section}:{metric['name']} {len(retry)}/{len(members)} packed result(s) missing, splitting")
+            self.pack_stats.record_split()
+            for half in split(retry):
+                if len(half) == 1:
+                    self.pack_stats.record_fallback()
+                if half:
+                    results.update(self.evaluate_packed(section, metric, half))
+        return results
+
+    def report_stats(self):
+        """Print parse and per-model usage statistics, plus hedging/endpoint/packing stats when enabled."""
+        self.parse_stats.report(self.structured_mode)
+        self.model_stats.report()
+        if self.hedger is not None:
+            self.hedger.report()
+        if self.pool is not None:
+            self.pool.report()
+        if self.sample_stats.metrics:
+            self.sample_stats.report()
+        if self.pack_stats.requests:
+            self.pack_stats.report()
+        if self.triage_counts:
+            with self._triage_lock:
+                counts = dict(self.triage_counts)
+            total = sum(c["transcripts"] for c in counts.values())
+            trivial = total - counts.get("full", {}).get("transcripts", 0)
+            skipped = sum(c["skipped_metrics"] for c in counts.values())
+            detail = ", ".join(f"{label}={c['transcripts']}" for label, c in sorted(counts.items()))
+            print(f"[STATS] triage: {trivial}/{total} transcript(s) trivial ({detail}), {skipped} metric call(s) skipped")
+
+    # ---------- Repair ----------
+    def find_repairs(self, record: dict):
+        """List (section, metric) pairs that failed or are missing in an eval record."""
+        todo = []
+        sections = record.get("sections", {})
+        for section, metrics in self.METRICS.items():
+            existing = {m["name"]: m for m in sections.get(section, {}).get("metrics", [])}
+            for metric in metrics:
+                entry = existing.get(metric["name"])
+                if entry is None or is_failed(entry):
+                    todo.append((section, metric))
+        return todo
+
+    def find_stale(self, record: dict, include_unfingerprinted=False):
+        """List (section, metric) pairs whose definition changed since the record was written.
+
+        Entries written before fingerprints existed are only re-evaluated with include_unfingerprinted.
+        Metrics skipped by triage stay skipped.
+        """
+        todo = []
+        sections = record.get("sections", {})
+        for section, metrics in self.METRICS.items():
+            existing = {m["name"]: m for m in sections.get(section, {}).get("metrics", [])}
+            for metric in metrics:
+                entry = existing.get(metric["name"])
+                if entry is not None and entry.get("applicable") is False:
+                    continue
+                if entry is None or is_failed(entry):
+                    todo.append((section, metric))
+                elif "fingerprint" not in entry:
+                    if include_unfingerprinted:
+                        todo.append((section, metric))
+                elif entry["fingerprint"] != self.metric_fingerprint(section, metric, entry.get("packed", False)):
+                    todo.append((section, metric))
+        return todo
+
+    def patch_record(self, record: dict, fixes: dict, stamp="repaired_at"):
+        """Merge re-evaluated metrics into a record and recompute every total with the current WEIGHTS.
+
+        Metrics no longer in METRICS are dropped.
+        """
+        sections = record.setdefault("sections", {})
+        for section, metrics in self.METRICS.items():
+            existing = {m["name"]: m for m in sections.get(section, {}).get("metrics", [])}
+            metrics_data = []
+            for metric in metrics:
+                fixed = fixes.get((section, metric["name"]))
+                if fixed is not None:
+                    self.stamp_fingerprints(section, [fixed])
+                entry = fixed or existing.get(metric["name"])
+                metrics_data.append(entry or error_result(metric, RuntimeError("missing")))
+            sections[section] = section_summary(metrics_data)
+        for section in [s for s in sections if s not in self.METRICS]:
+            del sections[section]
+        record["aggregated"] = self.aggregate(sections)
+        record["weights"] = dict(self.WEIGHTS)
+        record[stamp] = int(time.time())
+        return record
+
+    def repair(self):
+        """Re-run only failed/missing metrics in existing eval files and patch them in place."""
+        self.reevaluate(self.find_repairs, "Repair", "repaired_at")
+
+    def recompute(self, include_unfingerprinted=False, dry_run=False):
+        """Bring eval files in line with the current METRICS and WEIGHTS.
+
+        Metrics whose fingerprint changed are re-evaluated; every other score is kept and the
+        totals are re-aggregated, so a weights-only change makes no LLM calls.
+        """
+        self.reevaluate(lambda record: self.find_stale(record, include_unfingerprinted),
+                        "Recompute", "recomputed_at", patch_all=True, dry_run=dry_run)
+
+    def reevaluate(self, find, label: str, stamp: str, patch_all=False, dry_run=False):
+        """Re-run the metrics `find(record)` selects in every eval file and patch the files in place.
+
+        With patch_all, files with nothing to re-run are still re-aggregated (no LLM calls).
+        """
+        jobs = []
+        reaggregate = []
+        foreign = []
+        for eval_path in sorted(self.OUT_DIR.glob("*.eval.json")):
+            record = json.loads(eval_path.read_text(encoding="utf-8"))
+            if not isinstance(record.get("sections"), dict):
+                # evaluator.py / evaluator1.py records (raw_evaluations layout) share OUT_DIR
+                foreign.append(eval_path.name)
+                continue
+            todo = find(record)
+            if not todo:
+                if patch_all:
+                    reaggregate.append((eval_path, record))
+                continue
+            transcript = self.TRANSCRIPTS_DIR / record.get("transcript_filename", "")
+            if not transcript.is_file():
+                print(f"[WARN] {eval_path.name}: transcript {transcript} not found, skipping")
+                continue
+            jobs.append((eval_path, record, self.prepare_text(transcript.read_text(encoding="utf-8")), todo))
+
+        if foreign:
+            print(f"[INFO] Skipping {len(foreign)} file(s) not in the eval.py sections layout: "
+                  f"{', '.join(foreign[:5])}{' ...' if len(foreign) > 5 else ''}")
+        calls = sum(len(todo) for *_, todo in jobs)
+        if dry_run:
+            for eval_path, _, _, todo in jobs:
+                print(f"[INFO] {eval_path.name}: {', '.join(s + ':' + m['name'] for s, m in todo)}")
+            print(f"{label}: {calls} metric(s) to re-evaluate in {len(jobs)} file(s), "
+                  f"{len(reaggregate)} file(s) to re-aggregate only.")
+            return
+
+        changed = 0
+        for eval_path, record in reaggregate:
+            previous = copy.deepcopy(record)
+            self.patch_record(record, {}, stamp)
+            if (record["aggregated"], record["weights"]) != (previous.get("aggregated"), previous.get("weights")):
+                self.update_rollups(record, previous)
+                write_json_atomic(eval_path, record)
+                changed += 1
+        if reaggregate:
+            print(f"[INFO] Re-aggregated {changed}/{len(reaggregate)} file(s) without LLM calls")
+
+        if not calls:
+            print(f"Nothing to re-evaluate ({label.lower()}).")
+            if changed and self.config.rollups:
+                self.write_rollup_feeds()
+            return
+
+        from tqdm import tqdm
+
+        print(f"{label}: re-evaluating {calls} metric(s) across {len(jobs)} file(s) with {self.workers} worker(s)...\n")
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                (eval_path, section, metric["name"]): pool.submit(
+                    traced(self.evaluate_metric, "task", transcript=eval_path.name), section, metric, prepared[0]
+                )
+                for eval_path, _, prepared, todo in jobs
+                for section, metric in todo
+            }
+            still_failed = 0
+            for eval_path, record, (_, norm), todo in tqdm(jobs):
+                fixes = {}
+                for section, metric in todo:
+                    try:
+                        fixes[(section, metric["name"])] = futures[(eval_path, section, metric["name"])].result()
+                    except Exception as e:
+                        print(f"[ERROR] {eval_path.name} {section}:{metric['name']} -> {e}")
+                        fixes[(section, metric["name"])] = error_result(metric, e)
+                        still_failed += 1
+                self.restore_proofs(list(fixes.values()), norm)
+                previous = copy.deepcopy(record)
+                self.patch_record(record, fixes, stamp)
+                self.update_rollups(record, previous)
+                write_json_atomic(eval_path, record)
+                print(f"[SUCCESS] Patched: {eval_path}")
+
+        print(f"\n✅ Re-evaluated {calls - still_failed}/{calls} metric(s).")
+        self.report_stats()
+        if self.config.rollups:
+            self.write_rollup_feeds()
+
+
+    # ---------- Explanations ----------
+    def explain_entry(self, section: str, metric: dict, transcript: str, entry: dict):
+        """Generate comments and proof for a score-only entry, in place. Failures leave it unexplained."""
+        messages = [
+            {"role": "system", "content": f"Explain the voicebot's {section} score objectively."},
+            {"role": "user", "content": self.explain_prompt(section, metric, transcript, entry["score"])}
+        ]
+        try:
+            data = self.call_and_parse(messages, metric, entry.get("model") or self.model, schema=explain_schema())
+        except Exception as e:
+            print(f"[WARN] {section}:{metric['name']}: explanation failed ({e})")
+            return entry
+        entry.update(comments=data.get("comments", ""), proof=data.get("proof", ""),
+                     explained=True, explained_at=int(time.time()))
+        return entry
+
+    def explain(self, target: str, metric_names=None):
+        """Explain the unexplained metrics of one eval record and cache the result in the record.
+
+        `target` is a transcript or eval file name, always looked up in OUT_DIR (directories are
+        ignored); `metric_names` limits which metrics are explained (default: every score-only
+        metric). Returns the explained entries.
+        """
+        name = Path(target).name
+        stem = name[:-len(".eval.json")] if name.endswith(".eval.json") else Path(name).stem
+        eval_path = self.OUT_DIR / f"{stem}.eval.json"
+        record = json.loads(eval_path.read_text(encoding="utf-8"))
+        transcript = self.TRANSCRIPTS_DIR / record["transcript_filename"]
+        prompt_text, norm = self.prepare_text(transcript.read_text(encoding="utf-8"))
+
+        explained = []
+        for section, metrics in self.METRICS.items():
+            entries = {m["name"]: m for m in record.get("sections", {}).get(section, {}).get("metrics", [])}
+            for metric in metrics:
+                entry = entries.get(metric["name"])
+                if entry is None or entry.get("explained") is not False:
+                    continue
+                if metric_names and metric["name"] not in metric_names:
+                    continue
+                if self.explain_entry(section, metric, prompt_text, entry).get("explained"):
+                    explained.append(entry)
+        if explained:
+            self.restore_proofs(explained, norm)
+            write_json_atomic(eval_path, record)
+        print(f"[INFO] {eval_path.name}: explained {len(explained)} metric(s)")
+        return explained
+
+    def serve_explanations(self, host="127.0.0.1", port=8765, allow_origin="http://localhost:5173"):
+        """Tiny HTTP endpoint for the dashboard: POST /explain {"transcript_filename", "metric"}
+        explains one metric on demand and returns the updated entries.
+
+        Explanations are paid LLM calls that rewrite eval files, so browser requests are only
+        accepted from `allow_origin` (the dashboard); requests without an Origin header (curl) pass.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        evaluator = self
+        lock = threading.Lock()  # one read-modify-write of an eval record at a time
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Access-Control-Allow-Origin", allow_origin)
+                self.send_header("Access-Control-Allow-Headers", "Content-Type")
+                self.send_header("Vary", "Origin")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _origin_ok(self):
+                origin = self.headers.get("Origin")
+                return origin is None or origin == allow_origin
+
+            def do_OPTIONS(self):
+                self._send(204 if self._origin_ok() else 403, {})
+
+            def do_POST(self):
+                if not self._origin_ok():
+                    return self._send(403, {"error": "origin not allowed"})
+                if self.path.rstrip("/") != "/explain":
+                    return self._send(404, {"error": "not found"})
+                try:
+                    req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    if not isinstance(req, dict):
+                        return self._send(400, {"error": "request body must be a JSON object"})
+                    if not isinstance(req.get("transcript_filename"), str):
+                        return self._send(400, {"error": "transcript_filename must be a string"})
+                    metrics = [req["metric"]] if req.get("metric") else None
+                    with lock:
+                        entries = evaluator.explain(Path(req["transcript_filename"]).name, metrics)
+                except (KeyError, ValueError, OSError) as e:
+                    return self._send(400, {"error": str(e)})
+                self._send(200, {"explained": entries})
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        print(f"[INFO] Serving explanations on http://{host}:{port}/explain (allowed origin: {allow_origin})")
+        server.serve_forever()
+
+    # ---------- Merge ----------
+    def merge(self, shard_dirs, out_dir: Path):
+        """Combine per-shard evaluations/ outputs into one directory with summary.json and index.json."""
+        records, report = merge_shards(shard_dirs, self.TRANSCRIPTS_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name, record in records.items():
+            write_json_atomic(out_dir / f"{Path(name).stem}.eval.json", record)
+
+        summary = build_summary(records, report)
+        write_json_atomic(out_dir / "summary.json", summary)
+        write_json_atomic(out_dir / "index.json", build_index(records, report["sources"]))
+
+        shard_dbs = [Path(d) / "rollups.db" for d in shard_dirs if (Path(d) / "rollups.db").is_file()]
+        if shard_dbs:
+            target = out_dir / "rollups.db"
+            for path in (target, Path(f"{target}-wal"), Path(f"{target}-shm")):
+                if path.exists():
+                    path.unlink()  # merge from scratch so re-running merge doesn't double count
+            store = self.rollup_store(out_dir)
+            rows = sum(store.merge_from(db) for db in shard_dbs)
+            print(f"[INFO] Merged {rows} rollup row(s) from {len(shard_dbs)} shard(s)")
+            if report["duplicates"]:
+                print("[WARN] Rollups count duplicated transcripts once per shard; "
+                      f"run `eval.py rollups --rebuild --dir {out_dir}` to fix")
+            self.write_rollup_feeds(store, out_dir)
+
+        print(f"Merged {report['evaluated']}/{report['expected']} transcript(s) into {out_dir}/")
+        for name in report["duplicates"]:
+            print(f"[WARN] {name}: evaluated in more than one shard, kept newest")
+        for name in report["unexpected"]:
+            print(f"[WARN] {name}: evaluated but not present in {self.TRANSCRIPTS_DIR}/")
+        for name in report["missing"]:
+            print(f"[ERROR] {name}: missing from every shard")
+        return summary
+
+
+    # ---------- Distributed Queue ----------
+    def enqueue(self, queue, max_attempts=3, shard=None, shard_by="name", retry_dead=False):
+        """Add one job per transcript x section to the work queue (and requeue dead letters if asked)."""
+        if retry_dead:
+            print(f"[INFO] Requeued {queue.retry_dead()} dead-lettered job(s)")
+        files = sorted(self.TRANSCRIPTS_DIR.glob("*.txt"))
+        if shard:
+            files = select_shard(files, shard[0], shard[1], by=shard_by)
+        added = 0
+        for f in files:
+            for section in self.METRICS:
+                added += queue.enqueue(f.name, section, max_attempts=max_attempts)
+        skipped = len(files) * len(self.METRICS) - added
+        print(f"Enqueued {added} job(s) for {len(files)} transcript(s)"
+              + (f" ({skipped} already queued)." if skipped else "."))
+
+    def work(self, queue, worker_id=None, lease_seconds=300.0, poll_seconds=5.0):
+        """Pull jobs until the queue is drained. Safe to run many workers on many hosts."""
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        print(f"[INFO] Worker {worker_id} started")
+        if self.triage_mode == "model":
+            print("[WARN] TRIAGE=model is not supported by queue workers (one job per section would pay "
+                  "one label call per stage); using TRIAGE=rules")
+            self.triage_mode = "rules"
+        done = 0
+        while True:
+            with span("queue_lease", cat="wait"):
+                job = queue.lease(worker_id, lease_seconds)
+            if job is None:
+                counts = queue.stats()
+                if not counts["queued"] and not counts["leased"]:
+                    break
+                with span("queue_poll", cat="wait"):
+                    time.sleep(poll_seconds)  # remaining jobs are leased elsewhere; wait in case one expires
+                continue
+
+            stop = threading.Event()
+            beat = threading.Thread(
+                target=self._heartbeat, args=(queue, job["id"], worker_id, lease_seconds, stop), daemon=True
+            )
+            beat.start()
+            try:
+                result = self.run_job(job)
+            except Exception as e:
+                status = queue.fail(job["id"], worker_id, str(e))
+                print(f"[ERROR] {job['transcript']}:{job['stage']} attempt {job['attempts']} -> {e} ({status})")
+                continue
+            finally:
+                stop.set()
+                beat.join()
+
+            if not queue.complete(job["id"], worker_id, result):
+                print(f"[WARN] {job['transcript']}:{job['stage']} lease lost, result discarded")
+                continue
+            done += 1
+            sections = queue.results(job["transcript"])
+            # two workers can finish a transcript's last stages together; only the claimant writes and rolls up
+            if sections is not None and queue.claim_save(job["transcript"], worker_id):
+                # every stage carries the same transcript-level metadata; keep the first copy
+                meta = [(r.pop("triage", None), r.pop("normalization", None)) for r in sections.values()]
+                ordered = {s: sections[s] for s in self.METRICS if s in sections}
+                if meta[0][0] is not None:
+                    self.count_triage(meta[0][0])
+                try:
+                    self.save_record(job["transcript"], ordered, meta[0][0], meta[0][1])
+                except BaseException:
+                    queue.release_save(job["transcript"])
+                    raise
+
+        counts = queue.stats()
+        print(f"\n✅ Worker {worker_id} finished {done} job(s). Queue: {counts}")
+        stranded = queue.stranded()
+        if stranded:
+            print(f"[WARN] {len(stranded)} transcript(s) have dead-lettered stages and will not be saved "
+                  f"until requeued (`eval.py enqueue --retry-dead`); see `eval.py queue-status`")
+        self.report_stats()
+        if self.config.rollups and done:
+            self.write_rollup_feeds()
+
+    def run_job(self, job: dict):
+        """Evaluate one transcript x section job. Raises if every metric failed so the job is retried."""
+        path = self.TRANSCRIPTS_DIR / job["transcript"]
+        text = path.read_text(encoding="utf-8")
+        prompt_text, norm = self.prepare_text(text)
+        tri = self.triage_transcript(text, count=False) if self.triage_mode != "off" else None
+        with span("section", section=job["stage"], transcript=job["transcript"]):
+            result = self.evaluate_section(job["stage"], prompt_text, tri and tri["label"])
+        self.restore_proofs(result["metrics"], norm)
+        if all(is_failed(m) for m in result["metrics"]):
+            raise RuntimeError(result["metrics"][0]["comments"])
+        # transcript-level details travel with the section result and are attached to the record on save
+        if tri is not None:
+            result["triage"] = tri
+        if norm is not None:
+            result["normalization"] = norm.stats()
+        return result
+
+    @staticmethod
+    def _heartbeat(queue, job_id, worker_id, lease_seconds, stop):
+        while not stop.wait(lease_seconds / 3):
+            if not queue.heartbeat(job_id, worker_id, lease_seconds):
+                print(f"[WARN] Lost lease on job {job_id}")
+                return
+
+
+# ---------- Entry ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hybrid metric-wise voicebot evaluator")
+    parser.add_argument("--profile", metavar="TRACE_JSON",
+                        help="Record stage timings and write a Chrome/Perfetto trace to this path")
+    sub = parser.add_subparsers(dest="command")
+    run_p = sub.add_parser("run", help="Evaluate every transcript (default)")
+    run_p.add_argument("--shard", type=parse_shard, help="Only evaluate shard i/n (0-based), e.g. 0/4")
+    run_p.add_argument("--shard-by", choices=("name", "content"), default="name",
+                       help="Hash transcripts by file name (default) or content")
+    repair_p = sub.add_parser("repair", help="Re-evaluate only failed or missing metrics in evaluations/")
+    repair_p.add_argument("--workers", type=int, help="Concurrent metric calls (default: EVAL_WORKERS or 4)")
+    merge_p = sub.add_parser("merge", help="Merge per-shard evaluations/ dirs and check completeness")
+    merge_p.add_argument("shard_dirs", nargs="+", type=Path, help="evaluations/ directories from each shard")
+    merge_p.add_argument("--out", type=Path, default=Path("evaluations_merged"), help="Output directory")
+    queue_default = os.getenv("EVAL_QUEUE", "jobs.db")
+    enqueue_p = sub.add_parser("enqueue", help="Add transcript x section jobs to the work queue")
+    enqueue_p.add_argument("--queue", default=queue_default, help="SQLite queue path (default: EVAL_QUEUE or jobs.db)")
+    enqueue_p.add_argument("--max-attempts", type=int, default=3, help="Attempts before a job is dead-lettered")
+    enqueue_p.add_argument("--shard", type=parse_shard, help="Only enqueue shard i/n (0-based)")
+    enqueue_p.add_argument("--shard-by", choices=("name", "content"), default="name",
+                           help="Hash transcripts by file name (default) or content")
+    enqueue_p.add_argument("--retry-dead", action="store_true",
+                           help="Requeue dead-lettered jobs with fresh attempts before enqueueing")
+    worker_p = sub.add_parser("worker", help="Pull and evaluate jobs from the work queue until it is drained")
+    worker_p.add_argument("--queue", default=queue_default, help="SQLite queue path (default: EVAL_QUEUE or jobs.db)")
+    worker_p.add_argument("--lease", type=float, default=300.0, help="Lease length in seconds")
+    worker_p.add_argument("--worker-id", help="Identifier recorded on leases (default: host:pid)")
+    explain_p = sub.add_parser("explain", help="Generate and cache comments/proof for score-only metrics")
+    explain_p.add_argument("targets", nargs="+", help="Transcript or eval file names (looked up in evaluations/)")
+    explain_p.add_argument("--metric", action="append", help="Only explain this metric (repeatable)")
+    serve_p = sub.add_parser("serve-explain", help="Serve on-demand explanations to the dashboard")
+    serve_p.add_argument("--host", default="127.0.0.1")
+    serve_p.add_argument("--port", type=int, default=8765)
+    serve_p.add_argument("--allow-origin", default="http://localhost:5173",
+                         help="Dashboard origin allowed to call the endpoint (default: the Vite dev server)")
+    recompute_p = sub.add_parser(
+        "recompute", help="Re-evaluate metrics whose definition changed; re-aggregate the rest with current WEIGHTS"
+    )
+    recompute_p.add_argument("--include-unfingerprinted", action="store_true",
+                             help="Also re-evaluate metrics from records written before fingerprints existed")
+    recompute_p.add_argument("--dry-run", action="store_true", help="Only list what would be re-evaluated")
+    recompute_p.add_argument("--workers", type=int, help="Concurrent metric calls (default: EVAL_WORKERS or 4)")
+    rollups_p = sub.add_parser("rollups", help="Write hourly/daily trend feeds from evaluations/rollups.db")
+    rollups_p.add_argument("--rebuild", action="store_true", help="Recreate rollups.db from every eval file first")
+    rollups_p.add_argument("--since", help="Only buckets at or after this label, e.g. 2026-10-01")
+    rollups_p.add_argument("--dir", type=Path, help="Evaluations directory holding rollups.db (default: evaluations/)")
+    status_p = sub.add_parser("queue-status", help="Show job counts, dead letters and stranded transcripts")
+    status_p.add_argument("--queue", default=queue_default, help="SQLite queue path (default: EVAL_QUEUE or jobs.db)")
+    args = parser.parse_args(argv)
+
+    if args.command == "queue-status":
+        queue = SQLiteWorkQueue(args.queue)
+        print(queue.stats())
+        for job in queue.dead_letters():
+            print(f"[DEAD] {job['transcript']}:{job['stage']} attempts={job['attempts']} error={job['last_error']}")
+        for entry in queue.stranded():
+            print(f"[STRANDED] {entry['transcript']}: done={len(entry['done'])} dead={','.join(entry['dead'])}")
+        return
+
+    if args.profile:
+        profiling.enable()
+    evaluator = None
+    try:
+        evaluator = HybridEvaluator()
+        if args.command in (None, "run", "repair", "worker", "explain", "serve-explain"):
+            evaluator.ensure_client()  # fail fast on missing credentials
+        if args.command == "repair":
+            if args.workers:
+                evaluator.workers = args.workers
+            evaluator.repair()
+        elif args.command == "recompute":
+            if args.workers:
+                evaluator.workers = args.workers
+            evaluator.recompute(args.include_unfingerprinted, args.dry_run)
+        elif args.command == "enqueue":
+            evaluator.enqueue(SQLiteWorkQueue(args.queue), max_attempts=args.max_attempts, shard=args.shard,
+                              shard_by=args.shard_by, retry_dead=args.retry_dead)
+        elif args.command == "worker":
+            evaluator.work(SQLiteWorkQueue(args.queue), worker_id=args.worker_id, lease_seconds=args.lease)
+        elif args.command == "rollups":
+            if args.dir:
+                evaluator.OUT_DIR = args.dir
+            store = evaluator.rebuild_rollups() if args.rebuild else evaluator.rollup_store()
+            evaluator.write_rollup_feeds(store, since=args.since)
+        elif args.command == "explain":
+            for target in args.targets:
+                evaluator.explain(target, args.metric)
+        elif args.command == "serve-explain":
+            evaluator.serve_explanations(args.host, args.port, args.allow_origin)
+        elif args.command == "merge":
+            summary = evaluator.merge(args.shard_dirs, args.out)
+            if not summary["complete"]:
+                sys.exit(1)
+        else:
+            evaluator.run(shard=getattr(args, "shard", None), shard_by=getattr(args, "shard_by", "name"))
+    finally:
+        if evaluator is not None and evaluator.pool is not None:
+            evaluator.pool.close()
+        if args.profile:
+            profiling.finish(args.profile)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
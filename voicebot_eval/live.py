@@ -0,0 +1,101 @@
+"""
+Incremental evaluation of a call in progress.
+
+    session = LiveSession("call-123", config)
+    session.add_turn("Agent", "Hello, this call is on a recorded line ...")
+    ...
+    session.settled()           # metrics already decided, e.g. introduction
+    result = session.finish()   # remaining metrics, then the full Result
+
+Metrics tagged "settle": "opening" in METRICS are scored in the background as
+soon as the opening turns have arrived. Everything else runs once at the end;
+metrics tagged "context": "tail" only see the last few turns, so the post-call
+requests stay small.
+"""
+
+import threading
+
+from .api import Result, get_evaluator
+
+
+class LiveSession:
+    def __init__(self, call_id: str, config=None, evaluator=None, opening_turns: int = 6, tail_turns: int = 6):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.call_id = call_id
+        self.evaluator = evaluator or get_evaluator(config)
+        self.opening_turns = opening_turns
+        self.tail_turns = tail_turns
+        self.turns = []
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, self.evaluator.workers))
+        self._finished = False
+
+    # ---------- Turns ----------
+    def add_turn(self, speaker: str, text: str):
+        """Append one turn and dispatch any metrics that became decidable."""
+        with self._lock:
+            if self._finished:
+                raise RuntimeError(f"Session {self.call_id} is already finished")
+            self.turns.append(f"{speaker.strip()}: {' '.join(text.split())}")
+            ready = len(self.turns) >= self.opening_turns
+        if ready:
+            self._settle("opening")
+
+    def transcript(self, turns=None):
+        return "\n".join(self.turns if turns is None else turns)
+
+    # ---------- Settlement ----------
+    def _settle(self, phase: str):
+        """Submit every not-yet-dispatched metric of `phase` ("opening" or "end")."""
+        with self._lock:
+            turns = list(self.turns[:self.opening_turns] if phase == "opening" else self.turns)
+            for section, metrics in self.evaluator.METRICS.items():
+                for metric in metrics:
+                    key = (section, metric["name"])
+                    if key in self._futures or metric.get("settle", "end") != phase:
+                        continue
+                    context = turns[-self.tail_turns:] if metric.get("context") == "tail" else turns
+                    self._futures[key] = self._pool.submit(self._evaluate, section, metric, self.transcript(context))
+
+    def _evaluate(self, section: str, metric: dict, text: str):
+        from .hybrid import error_result
+
+        try:
+            return self.evaluator.evaluate_metric(section, metric, text)
+        except Exception as e:
+            print(f"[ERROR] {self.call_id} {section}:{metric['name']} -> {e}")
+            return error_result(metric, e)
+
+    def settled(self):
+        """Metric results already available, as {section: [metric entries]}."""
+        with self._lock:
+            done = {key: f.result() for key, f in self._futures.items() if f.done()}
+        out = {}
+        for section, metrics in self.evaluator.METRICS.items():
+            entries = [done[(section, m["name"])] for m in metrics if (section, m["name"]) in done]
+            if entries:
+                out[section] = entries
+        return out
+
+    def finish(self, save: bool = False):
+        """Run the end-of-call metrics, wait for everything and return the Result."""
+        from .hybrid import section_summary
+
+        self._settle("opening")  # short calls may never reach the opening threshold
+        self._settle("end")
+        with self._lock:
+            self._finished = True
+        try:
+            section_results = {
+                section: section_summary([self._futures[(section, m["name"])].result() for m in metrics])
+                for section, metrics in self.evaluator.METRICS.items()
+            }
+        finally:
+            self._pool.shutdown(wait=False)
+
+        record = self.evaluator.build_record(f"{self.call_id}.txt", section_results)
+        if save:
+            self.evaluator.write_record(record)
+        return Result.from_record(record)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Transcript Normalization Pre-pass
+- Runs once per transcript, before any prompt is built
+- Steps: whitespace compaction, speaker-label compaction (merge consecutive
+  turns by the same speaker), filler/disfluency stripping, duplicate-turn
+  collapse and optional [T<n>] turn numbering that proofs can cite
+- Keeps a turn -> original-lines mapping so proofs can be shown verbatim
+- Measures token savings with a local tokenizer (tiktoken if installed,
+  otherwise a word/punctuation approximation)
+"""
+
+import re
+
+from .triage import LABEL_RE
+
+
+STEPS = ("whitespace", "labels", "fillers", "dedupe", "numbering")
+DEFAULT_STEPS = ("whitespace", "labels", "fillers", "dedupe")
+
+# hyphens count as word characters so backchannels and compounds ("mm-hmm", "uh-huh", "Ah-series") stay whole
+FILLER_RE = re.compile(r"(?<![\w'-])(?:u+h+m*|u+m+|e+r+m+|h+m+|m+h*m+|a+h+)(?![\w'-])[,.]?\s*", re.IGNORECASE)
+# ASR stutter: a word said three or more times in a row. Pairs ("no, no", "bye bye") and
+# digits (phone/account numbers) are left alone since they can carry meaning.
+REPEAT_RE = re.compile(r"\b([^\W\d_]+)(?:[\s,]+\1\b){2,}", re.IGNORECASE)
+STUTTER_RE = re.compile(r"\b(\w{1,3})-\s+(?=\1)", re.IGNORECASE)
+TURN_REF_RE = re.compile(r"\[T(\d+)\]")
+
+
+def parse_steps(spec):
+    """Steps from a comma-separated spec, e.g. "default,numbering".
+
+    "default" (or "on") expands to DEFAULT_STEPS; "" / "off" disables normalization.
+    """
+    if not spec or spec.strip().lower() in ("off", "none", "0", "false"):
+        return ()
+    steps = []
+    for s in (s.strip().lower() for s in spec.split(",") if s.strip()):
+        for step in (DEFAULT_STEPS if s in ("default", "on", "1", "true") else (s,)):
+            if step not in steps:
+                steps.append(step)
+    steps = tuple(steps)
+    unknown = [s for s in steps if s not in STEPS]
+    if unknown:
+        raise ValueError(f"Unknown normalization step(s): {', '.join(unknown)}")
+    return steps
+
+
+# ---------- Tokens ----------
+_encoder = None
+
+
+def count_tokens(text: str):
+    """(token count, tokenizer name) using tiktoken when available."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # tiktoken missing or its encoding cannot be loaded offline
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text)), "cl100k_base"
+    return len(re.findall(r"\w+|[^\w\s]", text)), "approx"
+
+
+# ---------- Normalization ----------
+class NormalizedTranscript:
+    """Normalized prompt text plus the mapping back to the original transcript."""
+
+    def __init__(self, original: str, turns: list, steps: tuple):
+        self.original = original
+        self.turns = turns
+        self.steps = steps
+        self.text = "\n".join(self._render(t) for t in turns)
+
+    def _render(self, turn):
+        line = f"{turn['speaker']}: {turn['text']}" if turn["speaker"] else turn["text"]
+        return f"[T{turn['n']}] {line}" if "numbering" in self.steps else line
+
+    def original_lines(self, turn):
+        lines = self.original.splitlines()
+        return "\n".join(lines[i].strip() for i in turn["lines"])
+
+    def to_original(self, proof: str):
+        """Map a proof quoted from the normalized text back to the original transcript lines.
+
+        Returns the proof unchanged when it cannot be located.
+        """
+        if not proof:
+            return proof
+        refs = [int(n) for n in TURN_REF_RE.findall(proof)]
+        matched = [t for t in self.turns if t["n"] in refs]
+        if not matched:
+            needles = [p.strip() for p in re.split(r"\n|\.\.\.|…", TURN_REF_RE.sub("", proof)) if p.strip()]
+            for needle in needles:
+                text = LABEL_RE.match(needle).group(2) if LABEL_RE.match(needle) else needle
+                key = " ".join(text.lower().split())
+                pattern = re.compile(rf"(?<!\w){re.escape(key)}(?!\w)") if key else None
+                for t in self.turns:
+                    if pattern and pattern.search(t["text"].lower()) and t not in matched:
+                        matched.append(t)
+                        break
+        if not matched:
+            return proof
+        return "\n".join(self.original_lines(t) for t in sorted(matched, key=lambda t: t["n"]))
+
+    def stats(self):
+        before, tokenizer = count_tokens(self.original)
+        after, _ = count_tokens(self.text)
+        return {
+            "steps": list(self.steps),
+            "tokenizer": tokenizer,
+            "tokens_before": before,
+            "tokens_after": after,
+            "tokens_saved": before - after,
+            "saved_pct": round((before - after) / before * 100, 2) if before else 0.0
+        }
+
+
+def clean_text(text: str, steps):
+    if "fillers" in steps:
+        text = FILLER_RE.sub("", text)
+        text = STUTTER_RE.sub("", text)
+        text = REPEAT_RE.sub(r"\1", text)
+    if "whitespace" in steps or "fillers" in steps:
+        text = " ".join(text.split())
+        text = re.sub(r"\s+([,.?!])", r"\1", text)
+        text = re.sub(r"^[,.\s]+", "", text)
+    return text
+
+
+def normalize_transcript(text: str, steps=DEFAULT_STEPS):
+    """Normalize a transcript into turns and return a NormalizedTranscript."""
+    turns = []
+    for i, line in enumerate(text.splitlines()):
+        if not line.strip():
+            if "whitespace" not in steps:
+                turns.append({"speaker": None, "text": "", "lines": [i]})
+            continue
+        match = LABEL_RE.match(line)
+        if match:
+            speaker, body = match.group(1).strip(), match.group(2)
+        elif turns and "whitespace" in steps:
+            # unlabeled continuation line belongs to the previous turn
+            turns[-1]["text"] += " " + line.strip()
+            turns[-1]["lines"].append(i)
+            continue
+        else:
+            speaker, body = None, line
+        turns.append({"speaker": speaker, "text": body, "lines": [i]})
+
+    compacted = []
+    for turn in turns:
+        cleaned = clean_text(turn["text"], steps)
+        if turn["speaker"] and not cleaned and turn["text"].strip():
+            # the whole turn was filler ("Hmm."): it is a backchannel, so keep it without filler stripping
+            cleaned = clean_text(turn["text"], tuple(s for s in steps if s != "fillers"))
+        turn["text"] = cleaned
+        prev = compacted[-1] if compacted else None
+        if prev and "dedupe" in steps and prev["speaker"] == turn["speaker"] and prev["text"] == turn["text"]:
+            prev["lines"].extend(turn["lines"])
+            continue
+        if prev and "labels" in steps and turn["speaker"] and prev["speaker"] == turn["speaker"]:
+            prev["text"] = f"{prev['text']} {turn['text']}".strip()
+            prev["lines"].extend(turn["lines"])
+            continue
+        compacted.append(turn)
+
+    for n, turn in enumerate(compacted, 1):
+        turn["n"] = n
+    return NormalizedTranscript(text, compacted, tuple(steps))
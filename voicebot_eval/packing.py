@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Multi-transcript Packing for Short Calls
+- Groups short transcripts under a token budget so one request scores a metric
+  for several calls and the fixed rubric text is paid once per pack
+- Members are wrapped in delimited blocks with pack-local IDs (C1, C2, ...)
+  and the model answers with one JSON object per ID
+- Results are demultiplexed per transcript; members whose result is missing or
+  invalid are re-packed in halves until single calls fall back to normal scoring
+"""
+
+import threading
+
+from .normalize import count_tokens
+
+
+# ---------- Packing ----------
+def member_id(i: int):
+    return f"C{i + 1}"
+
+
+def build_packs(items, budget: int, max_members: int = 8):
+    """Greedy packs of (key, text, tokens, ...) items whose texts fit `budget` tokens together.
+
+    Items are kept in order; an item larger than the budget is not packed and is returned
+    in the second list so it can be evaluated on its own.
+    """
+    packs, current, used, single = [], [], 0, []
+    for item in items:
+        tokens = item[2]
+        if tokens > budget:
+            single.append(item)
+            continue
+        if current and (used + tokens > budget or len(current) >= max_members):
+            packs.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += tokens
+    if current:
+        packs.append(current)
+    return packs, single
+
+
+def packed_transcripts(texts):
+    """Delimited transcript blocks, one per member, in ID order."""
+    blocks = []
+    for i, text in enumerate(texts):
+        mid = member_id(i)
+        blocks.append(f"=== CALL {mid} ===\n{text.strip()}\n=== END {mid} ===")
+    return "\n\n".join(blocks)
+
+
+def packed_schema(ids, schema: dict):
+    """Schema for a packed response: {<id>: <single-metric schema>} for every member."""
+    return {
+        "type": "object",
+        "properties": {mid: schema for mid in ids},
+        "required": list(ids),
+        "additionalProperties": False
+    }
+
+
+def demux(data, ids):
+    """{id: result dict or None} from a packed response; None marks a missing member."""
+    if not isinstance(data, dict):
+        return {mid: None for mid in ids}
+    return {mid: data.get(mid) if isinstance(data.get(mid), dict) else None for mid in ids}
+
+
+def split(members):
+    """Two halves of a pack for retrying members whose results were missing."""
+    half = (len(members) + 1) // 2
+    return [members[:half], members[half:]]
+
+
+# ---------- Stats ----------
+class PackStats:
+    """Thread-safe counters for packed requests and the rubric overhead they carry."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.members = 0
+        self.overhead_tokens = 0
+        self.unpacked_overhead_tokens = 0
+        self.splits = 0
+        self.fallbacks = 0
+
+    def record_request(self, prompt: str, texts, single_overhead: int):
+        """Count one packed request; overhead is the prompt minus the transcripts it carries."""
+        overhead = count_tokens(prompt)[0] - sum(count_tokens(t)[0] for t in texts)
+        with self._lock:
+            self.requests += 1
+            self.members += len(texts)
+            self.overhead_tokens += overhead
+            self.unpacked_overhead_tokens += single_overhead * len(texts)
+
+    def record_split(self):
+        with self._lock:
+            self.splits += 1
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def summary(self):
+        with self._lock:
+            members = self.members or 1
+            return {
+                "requests": self.requests,
+                "transcript_metrics": self.members,
+                "transcripts_per_request": round(self.members / self.requests, 2) if self.requests else 0.0,
+                "overhead_tokens_per_transcript": round(self.overhead_tokens / members, 1),
+                "unpacked_overhead_tokens_per_transcript": round(self.unpacked_overhead_tokens / members, 1),
+                "splits": self.splits,
+                "fallbacks": self.fallbacks
+            }
+
+    def report(self):
+        s = self.summary()
+        print(
+            f"[STATS] packing: {s['requests']} request(s) for {s['transcript_metrics']} transcript-metric(s) "
+            f"({s['transcripts_per_request']} per request), overhead {s['overhead_tokens_per_transcript']} "
+            f"tokens/transcript (unpacked {s['unpacked_overhead_tokens_per_transcript']}), "
+            f"splits={s['splits']} fallbacks={s['fallbacks']}"
+        )
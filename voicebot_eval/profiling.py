@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Stage-level Profiling Timeline
+- `span(name, **args)` records how long a stage took on the current thread
+  (file read, prompt build, LLM call, parsing, writes, ...)
+- `traced(fn, name)` wraps work handed to a thread pool so the time spent
+  waiting for a worker shows up as a separate "queue_wait" span
+- Spans with cat="wait" (blocked on futures, pool slots, queue leases) are
+  reported on their own line, not ranked as bottlenecks
+- Writes a Chrome / Perfetto trace (chrome://tracing, ui.perfetto.dev) and
+  prints the stages with the most self time
+
+Spans cost nothing while profiling is off; `enable()` turns them on.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events = []
+        self.waits = []  # async spans (queue waits) that overlap whatever the thread ran before
+        self.threads = {}
+        self.origin = time.perf_counter()
+
+    def _now_us(self):
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def add(self, name: str, start_us: float, end_us: float, cat: str = "stage", args=None):
+        thread = threading.current_thread()
+        event = {
+            "name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": thread.ident,
+            "ts": round(start_us, 1), "dur": round(max(0.0, end_us - start_us), 1)
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+            self.threads.setdefault(thread.ident, thread.name)
+
+    def add_wait(self, name: str, start_us: float, end_us: float, args=None):
+        """Record a span that is not nested on one thread; shown on its own async track."""
+        with self._lock:
+            wid = len(self.waits) + 1
+            base = {"name": name, "cat": "wait", "pid": os.getpid(), "id": wid}
+            self.waits.append(
+                ({**base, "ph": "b", "ts": round(start_us, 1), "args": args or {}},
+                 {**base, "ph": "e", "ts": round(end_us, 1)})
+            )
+
+    @contextmanager
+    def span(self, name: str, cat: str = "stage", **args):
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self.add(name, start, self._now_us(), cat, args)
+
+    # ---------- Output ----------
+    def trace(self):
+        """Chrome trace-event JSON object."""
+        with self._lock:
+            events = list(self.events) + [e for pair in self.waits for e in pair]
+            threads = dict(self.threads)
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        return {"traceEvents": meta + sorted(events, key=lambda e: e["ts"]), "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace(), f)
+
+    def self_times(self):
+        """{name: {"cat", "count", "total_s", "self_s"}}; self time excludes spans nested on the same thread.
+
+        Queue waits have no thread of their own, so their self time is their whole duration.
+        """
+        with self._lock:
+            events = sorted(self.events, key=lambda e: (e["tid"], e["ts"], -e["dur"]))
+            waits = list(self.waits)
+        out = {}
+        for begin, end in waits:
+            stats = out.setdefault(begin["name"], {"cat": "wait", "count": 0, "total_s": 0.0, "self_s": 0.0})
+            stats["count"] += 1
+            stats["total_s"] += (end["ts"] - begin["ts"]) / 1e6
+            stats["self_s"] += (end["ts"] - begin["ts"]) / 1e6
+        stack = []  # (event, end_ts, child time) for open spans on the current thread
+        tid = None
+
+        def close(entry):
+            event, _, child = entry
+            stats = out.setdefault(event["name"], {"cat": event["cat"], "count": 0, "total_s": 0.0, "self_s": 0.0})
+            stats["count"] += 1
+            stats["total_s"] += event["dur"] / 1e6
+            stats["self_s"] += max(0.0, event["dur"] - child) / 1e6
+            if stack:
+                stack[-1][2] += event["dur"]
+
+        for event in events:
+            if event["tid"] != tid:
+                while stack:
+                    close(stack.pop())
+                tid = event["tid"]
+            while stack and event["ts"] >= stack[-1][1]:
+                close(stack.pop())
+            stack.append([event, event["ts"] + event["dur"], 0.0])
+        while stack:
+            close(stack.pop())
+        return out
+
+    def report(self, top: int = 10):
+        """Rank working stages by self time; waiting (cat="wait") is summarised separately."""
+        stats = self.self_times()
+        work = {name: s for name, s in stats.items() if s["cat"] != "wait"}
+        waits = {name: s for name, s in stats.items() if s["cat"] == "wait"}
+        if work:
+            total_self = sum(s["self_s"] for s in work.values()) or 1.0
+            print(f"[STATS] profile: top {min(top, len(work))} stage(s) by self time")
+            ranked = sorted(work.items(), key=lambda kv: kv[1]["self_s"], reverse=True)[:top]
+            for name, s in ranked:
+                print(
+                    f"[STATS]   {name:<16} self={s['self_s']:.3f}s ({s['self_s'] / total_self:.1%}) "
+                    f"total={s['total_s']:.3f}s count={s['count']}"
+                )
+        if waits:
+            detail = ", ".join(f"{name}={s['total_s']:.3f}s/{s['count']}"
+                               for name, s in sorted(waits.items(), key=lambda kv: -kv[1]["total_s"]))
+            print(f"[STATS] profile: waiting (not ranked): {detail}")
+
+
+# ---------- Module-level switch ----------
+_profiler = None
+
+
+def enable():
+    """Start recording spans process-wide and return the profiler."""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def active():
+    return _profiler
+
+
+def span(name: str, cat: str = "stage", **args):
+    """Context manager timing a stage, or a no-op when profiling is off."""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.span(name, cat, **args)
+
+
+def timed(name: str, cat: str = "stage"):
+    """Decorator form of span() for helpers such as JSON parsing."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            with span(name, cat):
+                return fn(*a, **kw)
+        return wrapper
+    return decorate
+
+
+def traced(fn, name: str, **args):
+    """Wrap `fn` for a thread pool: queue wait and run time become separate spans."""
+    profiler = _profiler
+    if profiler is None:
+        return fn
+    submitted = profiler._now_us()
+
+    def run(*a, **kw):
+        profiler.add_wait("queue_wait", submitted, profiler._now_us(), {"task": name, **args})
+        with profiler.span(name, **args):
+            return fn(*a, **kw)
+    return run
+
+
+def finish(path):
+    """Write the trace and print the self-time summary, if profiling was enabled."""
+    if _profiler is None:
+        return
+    _profiler.write(path)
+    print(f"[INFO] Profile trace written to {path} (open in chrome://tracing or ui.perfetto.dev)")
+    _profiler.report()
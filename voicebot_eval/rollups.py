@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Time-bucketed Score Rollups
+- One row per (granularity, time bucket, gold label, triage label, bot version, metric)
+  holding count, sum, sum of squares and a histogram sketch
+- Metrics: final_weighted_score and every section percentage
+- Updated in O(1) per eval record as it is written; a re-evaluated record
+  replaces its old contribution exactly (every field is additive). Records
+  are stamped "rolled_up" when added, and only stamped records are subtracted
+- Rollup databases from different shards merge by adding rows
+- Exported as a compact JSON feed for the dashboard trend charts
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+
+
+GRANULARITIES = ("hour", "day")
+BINS = 101  # one bin per percentage point, 0..100
+
+
+# ---------- Values ----------
+def bucket_start(ts: int, granularity: str):
+    """UTC bucket label: "2026-10-19T13:00" for hours, "2026-10-19" for days."""
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:00" if granularity == "hour" else "%Y-%m-%d")
+
+
+def record_values(record: dict):
+    """{metric: value} for one eval record (eval.py or evaluator.py layout); unscored sections are skipped."""
+    agg = record.get("aggregated", {})
+    values = {}
+    final = agg.get("final_weighted_score", agg.get("final_score"))
+    if final is not None:
+        values["final_weighted_score"] = final
+    for section, details in record.get("sections", {}).items():
+        if details.get("percentage") is not None:
+            values[f"section.{section}"] = details["percentage"]
+    for key, pct in agg.get("per_section_pct", {}).items():
+        if pct is not None:
+            values[f"section.{key[:-4] if key.endswith('_pct') else key}"] = pct
+    return values
+
+
+def record_dims(record: dict):
+    """(gold label, triage label, bot version) a record is rolled up under; "unknown" where not recorded."""
+    gold = record.get("selected_gold_label") or "unknown"
+    if gold.startswith("triaged:"):  # evaluator.py marks triaged calls instead of classifying them
+        gold = "unknown"
+    triage = (record.get("triage") or {}).get("label") or "unknown"
+    return gold, triage, record.get("bot_version") or "unknown"
+
+
+# ---------- Sketch ----------
+def sketch_bin(value: float):
+    return int(min(max(value, 0.0), 100.0))
+
+
+def quantile(hist: dict, count: int, q: float):
+    """Approximate quantile (bin midpoint) from a {bin: count} histogram."""
+    if count <= 0:
+        return None
+    target = q * count
+    seen = 0
+    for b in sorted(hist, key=int):
+        seen += hist[b]
+        if seen >= target:
+            return min(100.0, int(b) + 0.5)
+    return 100.0
+
+
+def cell_summary(count: int, total: float, sumsq: float, hist: dict):
+    mean = total / count
+    variance = max(0.0, sumsq / count - mean * mean)
+    return {
+        "n": count,
+        "mean": round(mean, 2),
+        "std": round(variance ** 0.5, 2),
+        "p50": quantile(hist, count, 0.5),
+        "p90": quantile(hist, count, 0.9)
+    }
+
+
+# ---------- Store ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    gold_label TEXT NOT NULL,
+    triage_label TEXT NOT NULL,
+    bot_version TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    sumsq REAL NOT NULL,
+    hist TEXT NOT NULL,
+    PRIMARY KEY (granularity, bucket, gold_label, triage_label, bot_version, metric)
+);
+"""
+KEY = "granularity = ? AND bucket = ? AND gold_label = ? AND triage_label = ? AND bot_version = ? AND metric = ?"
+
+
+class RollupStore:
+    """SQLite-backed rollup table; safe for several writers on one host."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with closing(self._connect()) as conn:
+            columns = [r["name"] for r in conn.execute("PRAGMA table_info(rollups)")]
+            if columns and "triage_label" not in columns:
+                self._migrate(conn)
+            conn.executescript(SCHEMA)
+
+    def _migrate(self, conn):
+        """Add the triage_label dimension to a database written before it existed."""
+        print(f"[WARN] {self.path} predates the triage dimension; its rows are kept with triage_label "
+              "'unknown'. Run `eval.py rollups --rebuild` to split them correctly.")
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("ALTER TABLE rollups RENAME TO rollups_old")
+        conn.execute(SCHEMA)
+        conn.execute(
+            "INSERT INTO rollups SELECT granularity, bucket, gold_label, 'unknown', bot_version, metric, "
+            "count, sum, sumsq, hist FROM rollups_old"
+        )
+        conn.execute("DROP TABLE rollups_old")
+        conn.execute("COMMIT")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _apply(self, rows):
+        """Add (key, count, sum, sumsq, hist) deltas in one transaction."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for key, count, total, sumsq, hist in rows:
+                row = conn.execute(f"SELECT count, sum, sumsq, hist FROM rollups WHERE {KEY}", key).fetchone()
+                if row is not None:
+                    merged = json.loads(row["hist"])
+                    for b, n in hist.items():
+                        merged[b] = merged.get(b, 0) + n
+                    hist = {b: n for b, n in merged.items() if n}
+                    count, total, sumsq = row["count"] + count, row["sum"] + total, row["sumsq"] + sumsq
+                if count <= 0:
+                    conn.execute(f"DELETE FROM rollups WHERE {KEY}", key)
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, count, total, sumsq, json.dumps(hist, sort_keys=True))
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _deltas(self, record: dict, sign: int):
+        dims = record_dims(record)
+        ts = record.get("timestamp") or int(time.time())
+        for granularity in GRANULARITIES:
+            bucket = bucket_start(ts, granularity)
+            for metric, value in record_values(record).items():
+                key = (granularity, bucket, *dims, metric)
+                yield key, sign, sign * value, sign * value * value, {str(sketch_bin(value)): sign}
+
+    def add(self, record: dict):
+        """Fold one eval record into every granularity and stamp it "rolled_up" (persist it after)."""
+        self._apply(list(self._deltas(record, 1)))
+        record["rolled_up"] = True
+
+    def replace(self, old: dict, new: dict):
+        """Swap a record's previous contribution for its re-evaluated one.
+
+        `old` is only subtracted if it was rolled up; records written before rollups were
+        enabled are simply added.
+        """
+        removed = list(self._deltas(old, -1)) if old and old.get("rolled_up") else []
+        self._apply(removed + list(self._deltas(new, 1)))
+        new["rolled_up"] = True
+
+    def merge_from(self, path):
+        """Add every row of another rollup database (e.g. one per shard)."""
+        with closing(sqlite3.connect(str(path))) as other:
+            other.row_factory = sqlite3.Row
+            rows = other.execute("SELECT * FROM rollups").fetchall()
+        if rows and "triage_label" not in rows[0].keys():
+            print(f"[WARN] {path} predates the triage dimension; its rows are merged with triage_label 'unknown'")
+        self._apply([
+            ((r["granularity"], r["bucket"], r["gold_label"],
+              r["triage_label"] if "triage_label" in r.keys() else "unknown", r["bot_version"], r["metric"]),
+             r["count"], r["sum"], r["sumsq"], json.loads(r["hist"]))
+            for r in rows
+        ])
+        return len(rows)
+
+    # ---------- Feed ----------
+    def feed(self, granularity: str = "day", since: str = None):
+        """Compact trend feed: one entry per bucket x gold label x triage label x bot version, values per metric."""
+        query = "SELECT * FROM rollups WHERE granularity = ?"
+        params = [granularity]
+        if since:
+            query += " AND bucket >= ?"
+            params.append(since)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                query + " ORDER BY bucket, gold_label, triage_label, bot_version, metric", params
+            ).fetchall()
+
+        series = {}
+        metrics = set()
+        for r in rows:
+            key = (r["bucket"], r["gold_label"], r["triage_label"], r["bot_version"])
+            entry = series.setdefault(key, {
+                "bucket": key[0], "gold_label": key[1], "triage_label": key[2], "bot_version": key[3], "values": {}
+            })
+            entry["values"][r["metric"]] = cell_summary(r["count"], r["sum"], r["sumsq"], json.loads(r["hist"]))
+            metrics.add(r["metric"])
+        return {
+            "generated_at": int(time.time()),
+            "granularity": granularity,
+            "metrics": sorted(metrics),
+            "series": list(series.values())
+        }
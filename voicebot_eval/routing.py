@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Per-metric Model Routing
+- Metrics tagged with "route": "fast" in METRICS go to a cheap model first
+- Escalates to the strong model when the cheap answer is malformed,
+  out of range, or the cheap samples disagree
+- Tracks per-model call counts, latency, tokens and cost
+"""
+
+import json
+import os
+import threading
+
+
+# ---------- Escalation ----------
+def escalation_reason(metric: dict, scores: list, tolerance: float):
+    """Return why cheap-model scores can't be trusted, or None if they can.
+
+    `scores` holds one entry per cheap sample; None marks a malformed response.
+    """
+    if not scores or any(s is None for s in scores):
+        return "malformed"
+    if any(s < 0 or s > metric["max"] for s in scores):
+        return "out_of_range"
+    if max(scores) - min(scores) > tolerance * metric["max"]:
+        return "disagreement"
+    return None
+
+
+# ---------- Stats ----------
+def load_prices():
+    """Per-model prices from MODEL_PRICES, e.g. {"gpt-4-turbo": [0.01, 0.03]} (USD per 1K in/out tokens)."""
+    raw = os.getenv("MODEL_PRICES")
+    if not raw:
+        return {}
+    return {model: tuple(p) for model, p in json.loads(raw).items()}
+
+
+class ModelStats:
+    """Thread-safe per-model call, latency, token and cost counters."""
+
+    def __init__(self, prices=None):
+        self._lock = threading.Lock()
+        self.prices = prices if prices is not None else load_prices()
+        self.models = {}
+        self.escalations = {}
+
+    def record(self, model: str, latency: float, usage=None):
+        usage = usage or {}
+        with self._lock:
+            m = self.models.setdefault(model, {
+                "calls": 0, "latency_s": 0.0, "prompt_tokens": 0, "completion_tokens": 0
+            })
+            m["calls"] += 1
+            m["latency_s"] += latency
+            m["prompt_tokens"] += usage.get("prompt_tokens", 0) or 0
+            m["completion_tokens"] += usage.get("completion_tokens", 0) or 0
+
+    def record_escalation(self, reason: str):
+        with self._lock:
+            self.escalations[reason] = self.escalations.get(reason, 0) + 1
+
+    def cost(self, model: str, m: dict):
+        price_in, price_out = self.prices.get(model, (0.0, 0.0))
+        return (m["prompt_tokens"] * price_in + m["completion_tokens"] * price_out) / 1000
+
+    def summary(self):
+        with self._lock:
+            out = {}
+            for model, m in self.models.items():
+                out[model] = dict(m)
+                out[model]["avg_latency_s"] = round(m["latency_s"] / m["calls"], 3) if m["calls"] else 0.0
+                out[model]["latency_s"] = round(m["latency_s"], 3)
+                out[model]["cost_usd"] = round(self.cost(model, m), 4)
+            return {"models": out, "escalations": dict(self.escalations)}
+
+    def report(self):
+        s = self.summary()
+        for model, m in s["models"].items():
+            print(
+                f"[STATS] model={model} calls={m['calls']} avg_latency={m['avg_latency_s']}s "
+                f"tokens={m['prompt_tokens']}+{m['completion_tokens']} cost=${m['cost_usd']}"
+            )
+        if s["escalations"]:
+            detail = ", ".join(f"{k}={v}" for k, v in sorted(s["escalations"].items()))
+            print(f"[STATS] escalations: {detail}")
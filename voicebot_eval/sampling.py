@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Adaptive Multi-sample Scoring
+- Starts from one sample per metric and draws more only when the samples
+  disagree beyond a tolerance or the estimate sits near a decision threshold
+- Stops as soon as the mean is stable, or at a sample cap
+- Reports per-metric variance and the average samples spent per metric
+"""
+
+import threading
+
+
+def mean_variance(scores):
+    """(mean, population variance) of a non-empty list of scores."""
+    mean = sum(scores) / len(scores)
+    return mean, sum((s - mean) ** 2 for s in scores) / len(scores)
+
+
+def parse_thresholds(spec: str):
+    """Decision thresholds as fractions of a metric's max, e.g. "0.5,0.8"."""
+    return tuple(float(t) for t in (spec or "").split(",") if t.strip())
+
+
+def needs_more(scores, max_score, tolerance=0.1, thresholds=(), margin=0.05, max_samples=5):
+    """Why another sample is needed ("disagreement", "near_threshold"), or None to stop.
+
+    `tolerance` and `margin` are fractions of `max_score`: samples must spread by at most
+    tolerance x max, and the mean must be further than margin x max from every threshold.
+    """
+    if len(scores) >= max_samples:
+        return None
+    if len(scores) > 1:
+        if max(scores) - min(scores) > tolerance * max_score:
+            return "disagreement"
+        # a mean that has settled and agreeing samples need no more confirmation
+        if len(scores) > 2:
+            return None
+    mean, _ = mean_variance(scores)
+    if any(abs(mean - t * max_score) <= margin * max_score for t in thresholds):
+        return "near_threshold"
+    return None
+
+
+class SampleStats:
+    """Thread-safe counters for samples spent per metric."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics = 0
+        self.samples = 0
+        self.capped = 0
+        self.reasons = {}
+
+    def record(self, samples: int, capped=False, reasons=()):
+        with self._lock:
+            self.metrics += 1
+            self.samples += samples
+            if capped:
+                self.capped += 1
+            for reason in reasons:
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                "metrics": self.metrics,
+                "samples": self.samples,
+                "avg_samples_per_metric": round(self.samples / self.metrics, 2) if self.metrics else 0.0,
+                "extra_samples": self.samples - self.metrics,
+                "unstable_at_cap": self.capped,
+                "reasons": dict(self.reasons)
+            }
+
+    def report(self):
+        s = self.summary()
+        reasons = ", ".join(f"{r}={n}" for r, n in sorted(s["reasons"].items())) or "none"
+        print(
+            f"[STATS] adaptive sampling: {s['metrics']} metric(s), avg {s['avg_samples_per_metric']} "
+            f"samples/metric, {s['extra_samples']} extra sample(s) ({reasons}), "
+            f"{s['unstable_at_cap']} unstable at cap"
+        )
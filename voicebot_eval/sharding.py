@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Deterministic Sharding for Multi-node Runs
+- `--shard i/n` picks transcripts by hashing their name (or content), so a
+  file's shard never changes when other files are added or removed
+- Merges per-shard evaluations/ outputs and checks the corpus is complete
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+
+def parse_shard(spec: str):
+    """Parse "i/n" (0-based index) into (i, n)."""
+    try:
+        index, count = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected i/n (e.g. 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}': need 0 <= i < n")
+    return index, count
+
+
+def shard_of(path: Path, count: int, by: str = "name"):
+    """Shard index of a transcript, hashed on its file name or its content."""
+    if by == "content":
+        data = path.read_bytes()
+    else:
+        data = path.name.encode("utf-8")
+    return int(hashlib.sha1(data).hexdigest(), 16) % count
+
+
+def select_shard(files, index: int, count: int, by: str = "name"):
+    """Files belonging to shard `index` of `count`, in their original order."""
+    return [f for f in files if shard_of(f, count, by) == index]
+
+
+# ---------- Merge ----------
+def merge_shards(shard_dirs, transcripts_dir: Path):
+    """Combine *.eval.json files from several shard output dirs.
+
+    Returns (records, report) where records maps transcript filename to the
+    newest eval record found, and report lists missing/duplicate transcripts.
+    """
+    records = {}
+    sources = {}
+    duplicates = []
+    for shard_dir in shard_dirs:
+        for eval_path in sorted(Path(shard_dir).glob("*.eval.json")):
+            record = json.loads(eval_path.read_text(encoding="utf-8"))
+            name = record.get("transcript_filename", eval_path.name.replace(".eval.json", ".txt"))
+            if name in records:
+                duplicates.append(name)
+                if record.get("timestamp", 0) <= records[name].get("timestamp", 0):
+                    continue
+            records[name] = record
+            sources[name] = str(shard_dir)
+
+    expected = {p.name for p in transcripts_dir.glob("*.txt")} if transcripts_dir.exists() else set()
+    report = {
+        "expected": len(expected),
+        "evaluated": len(records),
+        "missing": sorted(expected - set(records)),
+        "unexpected": sorted(set(records) - expected) if expected else [],
+        "duplicates": sorted(set(duplicates)),
+        "sources": sources
+    }
+    return records, report
+
+
+def build_index(records: dict, sources=None):
+    """One compact row per transcript for dashboards and lookups."""
+    sources = sources or {}
+    return [
+        {
+            "transcript_filename": name,
+            "timestamp": r.get("timestamp"),
+            "final_weighted_score": r.get("aggregated", {}).get("final_weighted_score"),
+            "shard": sources.get(name)
+        }
+        for name, r in sorted(records.items())
+    ]
+
+
+def build_summary(records: dict, report: dict):
+    """Corpus-level summary: completeness plus mean section and final scores."""
+    finals = [r["aggregated"]["final_weighted_score"] for r in records.values()
+              if "final_weighted_score" in r.get("aggregated", {})]
+    section_pcts = {}
+    for r in records.values():
+        for section, details in r.get("sections", {}).items():
+            if details.get("percentage", 0) is not None:  # None: no applicable metrics (triaged call)
+                section_pcts.setdefault(section, []).append(details.get("percentage", 0))
+    return {
+        "expected": report["expected"],
+        "evaluated": report["evaluated"],
+        "complete": not report["missing"],
+        "missing": report["missing"],
+        "duplicates": report["duplicates"],
+        "mean_final_weighted_score": round(sum(finals) / len(finals), 2) if finals else None,
+        "mean_section_percentage": {
+            s: round(sum(v) / len(v), 2) for s, v in section_pcts.items()
+        }
+    }
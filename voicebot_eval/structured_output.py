@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Structured Output Helpers
+- Builds JSON schemas for metric / section responses from the METRICS registry
+- Converts a schema into request parameters for OpenAI-compatible
+  (response_format) and vLLM-style (guided_json) endpoints
+- Tracks parse-failure and re-call rates so the saving can be reported
+"""
+
+import json
+import threading
+
+
+MODES = ("off", "openai", "vllm")
+
+
+# ---------- Schemas ----------
+def metric_schema(metric: dict):
+    """Schema for a single-metric response: {<name>: number, comments, proof}."""
+    return {
+        "type": "object",
+        "properties": {
+            metric["name"]: {"type": "number", "minimum": 0, "maximum": metric["max"]},
+            "comments": {"type": "string"},
+            "proof": {"type": "string"}
+        },
+        "required": [metric["name"], "comments", "proof"],
+        "additionalProperties": False
+    }
+
+
+def score_schema(metric: dict):
+    """Schema for a score-only response: {<name>: number}."""
+    return {
+        "type": "object",
+        "properties": {metric["name"]: {"type": "number", "minimum": 0, "maximum": metric["max"]}},
+        "required": [metric["name"]],
+        "additionalProperties": False
+    }
+
+
+def explain_schema():
+    """Schema for an explanation of an existing score: {comments, proof}."""
+    return {
+        "type": "object",
+        "properties": {"comments": {"type": "string"}, "proof": {"type": "string"}},
+        "required": ["comments", "proof"],
+        "additionalProperties": False
+    }
+
+
+def section_schema(metrics: list):
+    """Schema for a whole-section response: one number per metric plus comments."""
+    properties = {
+        m["name"]: {"type": "number", "minimum": 0, "maximum": m["max"]}
+        for m in metrics
+    }
+    properties["comments"] = {"type": "string"}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties.keys()),
+        "additionalProperties": False
+    }
+
+
+def request_params(mode: str, name: str, schema: dict):
+    """Extra ChatCompletion parameters that enforce `schema` for the given mode."""
+    if mode == "openai":
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": name, "schema": schema, "strict": True}
+            }
+        }
+    if mode == "vllm":
+        return {"guided_json": schema}
+    return {}
+
+
+def parse_structured(raw: str):
+    """Parse a schema-constrained response. No heuristic repair is attempted."""
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("Structured response is not a JSON object.")
+    return data
+
+
+# ---------- Stats ----------
+class ParseStats:
+    """Thread-safe counters for LLM calls, parse failures and re-calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.parse_failures = 0
+        self.recalls = 0
+
+    def record_call(self, recall=False):
+        with self._lock:
+            self.calls += 1
+            if recall:
+                self.recalls += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.parse_failures += 1
+
+    def summary(self):
+        with self._lock:
+            calls = self.calls
+            return {
+                "calls": calls,
+                "parse_failures": self.parse_failures,
+                "recalls": self.recalls,
+                "parse_failure_rate": round(self.parse_failures / calls, 4) if calls else 0.0,
+                "recall_rate": round(self.recalls / calls, 4) if calls else 0.0
+            }
+
+    def report(self, mode: str):
+        s = self.summary()
+        print(
+            f"[STATS] structured_output={mode} calls={s['calls']} "
+            f"parse_failures={s['parse_failures']} ({s['parse_failure_rate']:.1%}) "
+            f"recalls={s['recalls']} ({s['recall_rate']:.1%})"
+        )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Fast Triage for Trivial Calls
+- Labels hang-ups, voicemail, wrong numbers and "call me later" calls from
+  turn counts, keyword cues and length, without any LLM call
+- Optionally asks a small model to label short calls the rules can't settle
+- Only calls labelled "full" get the complete metric evaluation
+"""
+
+import re
+
+
+LABELS = ("full", "hangup", "voicemail", "wrong_number", "callback")
+
+CUES = {
+    "voicemail": ("voicemail", "voice mail", "leave a message", "leave your message", "after the tone",
+                  "after the beep", "mailbox", "is not available", "not reachable", "switched off"),
+    "wrong_number": ("wrong number", "no one by that name", "nobody by that name", "not the right person",
+                     "don't own", "do not own", "never bought", "you have the wrong"),
+    "callback": ("call later", "call me later", "call back", "callback", "call me back", "busy right now",
+                 "i'm driving", "i am driving", "in a meeting", "not a good time", "call tomorrow")
+}
+
+LABEL_RE = re.compile(r"^\s*([A-Za-z][A-Za-z0-9 _.-]{0,30}?)\s*:\s*(.*)$")
+CUSTOMER_LABELS = ("customer", "user", "caller", "client")
+
+# Metrics still evaluated for calls triaged as trivial (shared by eval.py and evaluator.py);
+# all others are marked not applicable
+TRIAGE_METRICS = {
+    "hangup": ["introduction"],
+    "voicemail": ["introduction"],
+    "wrong_number": ["introduction", "politeness_clarity", "closing"],
+    "callback": ["introduction", "interruption_handling", "politeness_clarity", "closing"]
+}
+AGENT_LABELS = ("agent", "bot", "voicebot", "assistant", "ai", "executive", "representative")
+AUTOMATED_LABELS = ("automated", "system", "recording", "ivr", "machine", "voicemail", "operator")
+
+
+def split_turns(text: str):
+    """[(speaker, text)] for labelled lines; unlabelled lines are appended to the previous turn."""
+    turns = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        match = LABEL_RE.match(line)
+        if match:
+            turns.append((match.group(1).strip().lower(), match.group(2).strip()))
+        elif turns:
+            turns[-1] = (turns[-1][0], f"{turns[-1][1]} {line.strip()}")
+        else:
+            turns.append(("", line.strip()))
+    return turns
+
+
+def has_role(speaker: str, labels):
+    """True if a speaker label names one of `labels` ("Customer", "customer 2", "Voicebot Agent")."""
+    return any(word in labels for word in re.split(r"[\s_.-]+", speaker))
+
+
+def customer_turns(turns):
+    """Customer turns. When no speaker is labelled as a customer ("Mr. Sharma:", "Speaker 2:"),
+    every turn that is not recognisably the agent's or an automated message counts."""
+    customer = [t for speaker, t in turns if has_role(speaker, CUSTOMER_LABELS)]
+    if customer:
+        return customer
+    return [t for speaker, t in turns if not has_role(speaker, AGENT_LABELS + AUTOMATED_LABELS)]
+
+
+def triage(text: str, max_customer_turns: int = 2, min_words: int = 25):
+    """Rule-based label for a transcript: {"label", "reason", "turns", "customer_turns", "words", "short"}."""
+    turns = split_turns(text)
+    customer = customer_turns(turns)
+    words = len(text.split())
+    short = len(customer) <= max_customer_turns
+    info = {"turns": len(turns), "customer_turns": len(customer), "words": words, "short": short}
+
+    if not short:
+        return {"label": "full", "reason": "conversation", **info}
+
+    lowered = text.lower()
+    customer_text = " ".join(customer).lower()
+    for cue in CUES["voicemail"]:
+        if cue in lowered and not customer:
+            return {"label": "voicemail", "reason": f"cue '{cue}'", **info}
+    for label in ("wrong_number", "callback"):
+        for cue in CUES[label]:
+            if cue in customer_text:
+                return {"label": label, "reason": f"cue '{cue}'", **info}
+    # a hang-up is a call that is short overall, not just one whose customer said little
+    if (not customer or words < min_words) and len(turns) <= 2 * max_customer_turns + 1:
+        return {"label": "hangup", "reason": f"{len(customer)} customer turn(s), {words} words", **info}
+    return {"label": "full", "reason": "no trivial-call cue", **info}
+
+
+def model_prompt(text: str):
+    """Single-word classification prompt for a short call."""
+    return (
+        "Classify this short voicebot call. Reply with exactly one label:\n"
+        "- hangup: the customer hung up or said almost nothing\n"
+        "- voicemail: the call reached voicemail or an automated message\n"
+        "- wrong_number: wrong person or the customer does not own the vehicle\n"
+        "- callback: the customer asked to be called later\n"
+        "- full: a real conversation that needs full evaluation\n\n"
+        f"Transcript:\n{text}"
+    )
+
+
+def parse_label(raw: str):
+    """First known label mentioned in a model reply, or None."""
+    answer = (raw or "").strip().lower()
+    for label in sorted(LABELS, key=len, reverse=True):
+        if label in answer or label.replace("_", " ") in answer:
+            return label
+    return None
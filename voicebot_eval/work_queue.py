@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Work Queue for Distributed Evaluation
+- Holds one job per transcript x stage (metric section)
+- Workers lease jobs, heartbeat while working and complete or fail them
+- Expired leases (dead workers) are re-leased; jobs that keep failing are dead-lettered
+- Dead letters can be requeued; a transcript's record is saved exactly once when its last stage is done
+- WorkQueue is the pluggable interface; SQLiteWorkQueue is the local backend
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+
+# ---------- Interface ----------
+class WorkQueue:
+    """Backend interface. Jobs are plain dicts with id, transcript, stage, attempts."""
+
+    def enqueue(self, transcript: str, stage: str, max_attempts: int = 3):
+        """Add a job; re-enqueueing an existing transcript/stage pair is a no-op. Returns True if added."""
+        raise NotImplementedError
+
+    def lease(self, worker_id: str, lease_seconds: float):
+        """Claim the next runnable job for `worker_id`, or return None."""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float):
+        """Extend a lease. Returns False if the worker no longer owns the job."""
+        raise NotImplementedError
+
+    def complete(self, job_id: int, worker_id: str, result):
+        """Store a job's result. Returns False if the lease was lost meanwhile."""
+        raise NotImplementedError
+
+    def fail(self, job_id: int, worker_id: str, error: str):
+        """Release a failed job for retry, or dead-letter it. Returns the new status."""
+        raise NotImplementedError
+
+    def results(self, transcript: str):
+        """{stage: result} for a transcript once every stage is done, else None."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Job counts by status."""
+        raise NotImplementedError
+
+    def dead_letters(self):
+        """Jobs that exhausted their attempts."""
+        raise NotImplementedError
+
+    def retry_dead(self):
+        """Requeue every dead-lettered job with fresh attempts. Returns the number requeued."""
+        raise NotImplementedError
+
+    def stranded(self):
+        """Transcripts that can never complete because a stage is dead: [{transcript, done, dead}]."""
+        raise NotImplementedError
+
+    def claim_save(self, transcript: str, worker_id: str):
+        """Claim the right to write a finished transcript's record. True for exactly one caller."""
+        raise NotImplementedError
+
+    def release_save(self, transcript: str):
+        """Give up a claim whose save failed so another worker can write the record."""
+        raise NotImplementedError
+
+
+# ---------- SQLite backend ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transcript TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires REAL,
+    heartbeat_at REAL,
+    last_error TEXT,
+    result TEXT,
+    updated_at REAL,
+    UNIQUE (transcript, stage)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+CREATE TABLE IF NOT EXISTS saves (
+    transcript TEXT PRIMARY KEY,
+    worker TEXT,
+    saved_at REAL
+);
+"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """SQLite-backed queue. Safe for many processes on one host; across hosts the
+    database must live on a filesystem with working locks (or use another backend)."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, transcript: str, stage: str, max_attempts: int = 3):
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO jobs (transcript, stage, max_attempts, updated_at) VALUES (?, ?, ?, ?)",
+                (transcript, stage, max_attempts, time.time())
+            )
+            return cur.rowcount == 1
+
+    def lease(self, worker_id: str, lease_seconds: float):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            # Expired leases whose attempts are used up go to the dead-letter state
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', last_error = 'lease expired', updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, heartbeat_at = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, now, row["id"])
+            )
+            conn.execute("COMMIT")
+            job = dict(row)
+            job["attempts"] += 1
+            return job
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, heartbeat_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (now + lease_seconds, now, job_id, worker_id)
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result):
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (json.dumps(result), time.time(), job_id, worker_id)
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END, "
+                "last_error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (error, time.time(), job_id, worker_id)
+            )
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return row["status"] if row else None
+
+    def results(self, transcript: str):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT stage, status, result FROM jobs WHERE transcript = ?", (transcript,)
+            ).fetchall()
+        if not rows or any(r["status"] != "done" for r in rows):
+            return None
+        return {r["stage"]: json.loads(r["result"]) for r in rows}
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {"queued": 0, "leased": 0, "done": 0, "dead": 0}
+        counts.update({r["status"]: r["n"] for r in rows})
+        return counts
+
+    def dead_letters(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, transcript, stage, attempts, last_error FROM jobs WHERE status = 'dead' ORDER BY id"
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def retry_dead(self):
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, last_error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE status = 'dead'",
+                (time.time(),)
+            )
+            return cur.rowcount
+
+    def stranded(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT transcript, stage, status FROM jobs WHERE transcript IN "
+                "(SELECT transcript FROM jobs WHERE status = 'dead') ORDER BY transcript, id"
+            ).fetchall()
+        out = {}
+        for r in rows:
+            entry = out.setdefault(r["transcript"], {"transcript": r["transcript"], "done": [], "dead": []})
+            if r["status"] in ("done", "dead"):
+                entry[r["status"]].append(r["stage"])
+        return list(out.values())
+
+    def claim_save(self, transcript: str, worker_id: str):
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO saves (transcript, worker, saved_at) VALUES (?, ?, ?)",
+                (transcript, worker_id, time.time())
+            )
+            return cur.rowcount == 1
+
+    def release_save(self, transcript: str):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM saves WHERE transcript = ?", (transcript,))